@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк CryptalBot.run_cycle против локальной заглушки API
+
+Пример:
+    python -m benchmarks.bench_cycle --accounts 10 --latency 0.05 --error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, Any, List
+from urllib.parse import urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_server import MockCryptalServer, REVOKED_PREFIX
+from src.core.config_manager import ConfigManager
+from src.core.http_client import HttpClient
+from src.core.metrics import metrics, percentile
+from src.utils.logger import Logger
+
+
+def endpoint_name(url: str) -> str:
+    """Имя эндпоинта без схемы, хоста и query-параметров"""
+    return urlparse(url).path or "/"
+
+
+class RequestTimer:
+    """Замер времени HttpClient.request_with_retry по эндпоинтам"""
+
+    def __init__(self):
+        self.timings: Dict[str, List[float]] = defaultdict(list)
+        self._original = None
+
+    def install(self):
+        original = self._original = HttpClient.request_with_retry
+        timings = self.timings
+
+        async def timed(client, method, url, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await original(client, method, url, *args, **kwargs)
+            finally:
+                timings[f"{method.upper()} {endpoint_name(url)}"].append(time.perf_counter() - started)
+
+        HttpClient.request_with_retry = timed
+
+    def uninstall(self):
+        if self._original is not None:
+            HttpClient.request_with_retry = self._original
+            self._original = None
+
+
+def build_config(
+    base_url: str,
+    retries: int,
+    rate: float,
+    state: bool,
+    shared_session: bool = True,
+    ip_lookup: bool = False
+) -> Dict[str, Any]:
+    """Конфигурация бота, направленная на заглушку без задержек"""
+    config = ConfigManager()._get_default_config()
+    config['api'].update({
+        'base_url': base_url,
+        'ip_url': f"{base_url}/?format=json",
+        'ip_lookup': ip_lookup,
+        'retries': retries,
+        'backoff_base': 0.05,
+        'rate_limit': {'requests_per_second': rate, 'burst': 10},
+    })
+    config['api']['connection']['shared_session'] = shared_session
+    config['delays'] = {'between_accounts': 0, 'between_tasks': 0, 'cycle_delay': 0}
+    config['state']['enabled'] = state
+    config['logging']['json_file'] = None
+    return config
+
+
+def build_tokens(accounts: int, revoked: int = 0, expired: int = 0) -> List[str]:
+    """Токены бенчмарка: последние аккаунты - отозванные (401) и с истекшим JWT"""
+    def jwt(exp: float) -> str:
+        payload = base64.urlsafe_b64encode(json.dumps({"exp": int(exp)}).encode()).decode().rstrip('=')
+        return f"eyJhbGciOiJIUzI1NiJ9.{payload}.signature"
+
+    tokens = []
+    for i in range(accounts):
+        if i >= accounts - expired:
+            tokens.append(jwt(time.time() - 3600 - i))
+        elif i >= accounts - expired - revoked:
+            tokens.append(f"{REVOKED_PREFIX}bench-token-{i:06d}")
+        else:
+            tokens.append(f"bench-token-{i:06d}")
+    return tokens
+
+
+async def run_benchmark(args) -> Dict[str, Any]:
+    """Запустить заглушку и выполнить заданное число циклов"""
+    server = MockCryptalServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        missing_endpoints=args.missing,
+        extra_tasks=args.extra_tasks,
+        etags=not args.no_etag,
+        page_total=not args.no_total,
+        seed=args.seed,
+    )
+    await server.start()
+    timer = RequestTimer()
+    workdir = tempfile.mkdtemp(prefix="cryptal-bench-")
+    cwd = os.getcwd()
+
+    try:
+        os.makedirs(os.path.join(workdir, "data"), exist_ok=True)
+        with open(os.path.join(workdir, "config.json"), "w", encoding="utf-8") as f:
+            json.dump(build_config(
+                server.base_url, args.retries, args.rate, not args.no_state,
+                not args.no_shared_session, args.ip_lookup
+            ), f)
+        with open(os.path.join(workdir, "data", "token.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(build_tokens(args.accounts, args.revoked, args.expired)))
+        os.chdir(workdir)
+
+        from main import CryptalBot
+
+        timer.install()
+        cycles = []
+        output = io.StringIO() if not args.verbose else sys.stdout
+        with contextlib.redirect_stdout(output):
+            bot = CryptalBot(headless=args.headless)
+            await bot.initialize()
+            for _ in range(args.cycles):
+                before = len(server.request_log)
+                started = time.perf_counter()
+                await bot.run_cycle()
+                cycles.append({
+                    'wall_time': time.perf_counter() - started,
+                    'requests': len(server.request_log) - before,
+                    'new_connections': metrics.cycle_counters.get(
+                        ('cryptal_http_connections_total', (('kind', 'new'),)), 0
+                    ),
+                })
+            Logger.flush()
+    finally:
+        timer.uninstall()
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+        await server.stop()
+
+    endpoints = {
+        name: {
+            'count': len(values),
+            'p50': percentile(values, 50),
+            'p95': percentile(values, 95),
+        }
+        for name, values in sorted(timer.timings.items())
+    }
+    return {
+        'accounts': args.accounts,
+        'cycles': cycles,
+        'wall_time': sum(cycle['wall_time'] for cycle in cycles),
+        'requests': sum(cycle['requests'] for cycle in cycles),
+        'endpoints': endpoints,
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    """Вывести отчет бенчмарка"""
+    print(f"Accounts: {report['accounts']}  Cycles: {len(report['cycles'])}")
+    for i, cycle in enumerate(report['cycles'], 1):
+        connections = f", {cycle['new_connections']:g} new connections" if cycle['new_connections'] else ""
+        print(f"  cycle #{i}: {cycle['wall_time']:.3f}s, {cycle['requests']} requests{connections}")
+    print(f"Total wall time: {report['wall_time']:.3f}s  Total requests: {report['requests']}")
+    print()
+    width = max([len(name) for name in report['endpoints']] + [8])
+    print(f"{'Endpoint'.ljust(width)}  {'count':>6}  {'p50 ms':>9}  {'p95 ms':>9}")
+    for name, stats in report['endpoints'].items():
+        print(
+            f"{name.ljust(width)}  {stats['count']:>6}  "
+            f"{stats['p50'] * 1000:>9.2f}  {stats['p95'] * 1000:>9.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CryptalBot.run_cycle against a mock API')
+    parser.add_argument('--accounts', type=int, default=5, help='Количество аккаунтов')
+    parser.add_argument('--cycles', type=int, default=1, help='Количество циклов')
+    parser.add_argument('--latency', type=float, default=0.0, help='Задержка ответа заглушки, секунды')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Разброс задержки, секунды')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Доля ответов HTTP 500 (0..1)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Доля ответов HTTP 429 (0..1)')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After для ответов 429, секунды')
+    parser.add_argument('--missing', nargs='*', default=[], help='Эндпоинты задач, отвечающие 404')
+    parser.add_argument('--extra-tasks', type=int, default=0, help='Дополнительные задачи в каталоге')
+    parser.add_argument('--no-etag', action='store_true', help='Заглушка не отдает ETag для каталога')
+    parser.add_argument('--no-total', action='store_true', help='Заглушка не передает total в страницах списков')
+    parser.add_argument('--retries', type=int, default=3, help='api.retries для бота')
+    parser.add_argument('--rate', type=float, default=0, help='api.rate_limit.requests_per_second (0 - без лимита)')
+    parser.add_argument('--revoked', type=int, default=0, help='Сколько из аккаунтов получают 401 (отозванные токены)')
+    parser.add_argument('--expired', type=int, default=0, help='Сколько из аккаунтов с истекшим JWT')
+    parser.add_argument('--no-shared-session', action='store_true', help='Отдельная сессия на каждый аккаунт (без общего пула)')
+    parser.add_argument('--ip-lookup', action='store_true', help='Включить api.ip_lookup (запрос публичного IP)')
+    parser.add_argument('--no-state', action='store_true', help='Отключить персистентное состояние аккаунтов')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', metavar='PATH', help='Сохранить отчет в JSON для сравнения')
+    parser.add_argument('--headless', action='store_true', help='Запустить бота в headless режиме')
+    parser.add_argument('--verbose', action='store_true', help='Не подавлять вывод бота')
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args))
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Бюджет времени холодного старта (импорт main.py) по python -X importtime
+
+Пример:
+    python -m benchmarks.bench_startup --budget-ms 200
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Модули, которые не должны импортироваться при старте в headless режиме
+DEFERRED_MODULES = ['aiohttp', 'aiohttp_socks', 'socks', 'rich', 'pyfiglet', 'aiofiles', 'src.utils.display']
+
+
+def measure() -> Tuple[int, List[Tuple[int, str]]]:
+    """Импортировать main в отдельном процессе: (общее время мкс, [(время мкс, модуль)])"""
+    env = dict(os.environ, RUN_MODE='once', HEADLESS='1')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+    imports = []
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|', 2)
+        module = name.strip()
+        imports.append((int(cumulative_us), module))
+        if module == 'main':
+            total = int(cumulative_us)
+    return total, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check cold start import time of main.py')
+    parser.add_argument('--budget-ms', type=float, default=200.0, help='Бюджет времени импорта main, мс')
+    parser.add_argument('--runs', type=int, default=3, help='Число замеров (берется лучший)')
+    parser.add_argument('--top', type=int, default=10, help='Показать N самых долгих импортов')
+    args = parser.parse_args()
+
+    # Первый запуск прогревает кэш байткода
+    measure()
+    runs = [measure() for _ in range(max(1, args.runs))]
+    total, imports = min(runs, key=lambda run: run[0])
+    loaded = {module for _, module in imports}
+
+    print(f"import main: {total / 1000:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print("Slowest imports (cumulative):")
+    for cumulative_us, module in sorted(imports, reverse=True)[1:args.top + 1]:
+        print(f"  {cumulative_us / 1000:>8.1f} ms  {module}")
+
+    failures = []
+    if total / 1000 > args.budget_ms:
+        failures.append(f"startup {total / 1000:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+    eager = [module for module in DEFERRED_MODULES if module in loaded]
+    if eager:
+        failures.append(f"imported at startup: {', '.join(eager)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Локальная заглушка Cryptal API для офлайн-бенчмарков
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from typing import Dict, Any, Optional, List, Set, Tuple
+from aiohttp import web
+
+API_PREFIX = "/apis/v2"
+
+# Эндпоинты задач: путь -> (HTTP метод, категория задачи)
+TASK_ENDPOINTS = {
+    "daily-login": ("GET", "daily_login"),
+    "follow-cryptal": ("GET", "follow_cryptal"),
+    "follow-discord": ("GET", "join_discord"),
+    "waitlist": ("POST", "join_waitlist"),
+    "feedback": ("POST", "submit_feedback"),
+}
+
+# Токены с этим префиксом заглушка отклоняет ответом 401 (отозванные токены)
+REVOKED_PREFIX = "revoked-"
+
+# Категории, которые бот пропускает, но которые присутствуют в каталоге
+EXTRA_CATEGORIES = ["invite_friend", "share_post"]
+
+
+def build_catalog(extra_tasks: int = 0) -> List[Dict[str, Any]]:
+    """Построить каталог задач в формате Cryptal API"""
+    categories = [category for _, category in TASK_ENDPOINTS.values()] + EXTRA_CATEGORIES
+    catalog = []
+    for i in range(len(categories) + extra_tasks):
+        category = categories[i] if i < len(categories) else f"unsupported_{i}"
+        catalog.append({
+            "id": f"task-{i:06d}",
+            "task_name": category.replace('_', ' ').title(),
+            "task_description": f"Mock task {category}",
+            "task_type": category,
+            "credits_reward": 10 * (i + 1),
+            "is_daily": category == "daily_login",
+            "is_one_time": category != "daily_login",
+        })
+    return catalog
+
+
+class MockCryptalServer:
+    """Заглушка Cryptal API с настраиваемой задержкой, ошибками, 429, 404 и 401 для отозванных токенов"""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1.0,
+        missing_endpoints: Optional[List[str]] = None,
+        extra_tasks: int = 0,
+        etags: bool = True,
+        page_total: bool = True,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.missing_endpoints = set(missing_endpoints or [])
+        self.catalog = build_catalog(extra_tasks)
+        self.etags = etags
+        self.page_total = page_total
+        self.random = random.Random(seed)
+        self.completed: Set[Tuple[str, str]] = set()
+        self.request_log: List[Dict[str, Any]] = []
+        self.runner = None
+        self.site = None
+        self.port = None
+
+    @property
+    def base_url(self) -> str:
+        """Базовый URL запущенного сервера"""
+        return f"http://127.0.0.1:{self.port}"
+
+    def reset(self):
+        """Сбросить выполненные задачи и журнал запросов"""
+        self.completed.clear()
+        self.request_log.clear()
+
+    def create_app(self) -> web.Application:
+        """Создать aiohttp приложение с маршрутами API"""
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get("/", self._public_ip)
+        app.router.add_get(f"{API_PREFIX}/auth/social-profiles", self._social_profiles)
+        app.router.add_get(f"{API_PREFIX}/vibe-credit", self._statistics)
+        app.router.add_get(f"{API_PREFIX}/vibe-credit/tasks", self._tasks)
+        app.router.add_get(f"{API_PREFIX}/vibe-credit/tasks/user-available", self._user_available)
+        for endpoint, (method, _) in TASK_ENDPOINTS.items():
+            app.router.add_route(method, f"{API_PREFIX}/vibe-credit/tasks/{endpoint}", self._complete_task)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        """Запустить сервер (port=0 - выбрать свободный порт)"""
+        self.runner = web.AppRunner(self.create_app(), access_log=None)
+        await self.runner.setup()
+        self.site = web.TCPSite(self.runner, host, port)
+        await self.site.start()
+        self.port = self.site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Остановить сервер"""
+        if self.runner:
+            await self.runner.cleanup()
+            self.runner = None
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        """Задержка, случайные ошибки и журнал запросов"""
+        started = time.perf_counter()
+        try:
+            if self.latency or self.jitter:
+                await asyncio.sleep(max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+
+            endpoint = request.path.rsplit('/', 1)[-1]
+            if endpoint in self.missing_endpoints:
+                response = web.json_response({"message": "Not Found"}, status=404)
+            elif self.error_rate and self.random.random() < self.error_rate:
+                response = web.json_response({"message": "Internal Server Error"}, status=500)
+            elif self.throttle_rate and self.random.random() < self.throttle_rate:
+                response = web.json_response(
+                    {"message": "Too Many Requests"},
+                    status=429,
+                    headers={"Retry-After": f"{self.retry_after:g}"}
+                )
+            elif request.path.startswith(API_PREFIX) and (
+                not request.headers.get("authorization") or self._token(request).startswith(REVOKED_PREFIX)
+            ):
+                response = web.json_response({"message": "Unauthorized"}, status=401)
+            else:
+                response = await handler(request)
+            return response
+        finally:
+            self.request_log.append({
+                "method": request.method,
+                "path": request.path,
+                "duration": time.perf_counter() - started,
+            })
+
+    @staticmethod
+    def _token(request: web.Request) -> str:
+        """Получить токен из заголовка авторизации"""
+        return request.headers.get("authorization", "").replace("Bearer ", "", 1)
+
+    def _page(self, request: web.Request, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Вернуть страницу списка по параметрам take/skip"""
+        take = int(request.query.get("take", 100))
+        skip = int(request.query.get("skip", 0))
+        body = {"data": items[skip:skip + take]}
+        if self.page_total:
+            body["total"] = len(items)
+        return {"response": body}
+
+    async def _public_ip(self, request: web.Request) -> web.Response:
+        return web.json_response({"ip": "127.0.0.1"})
+
+    async def _social_profiles(self, request: web.Request) -> web.Response:
+        token = self._token(request)
+        return web.json_response({"response": [{"display_name": f"mock_{token[-6:]}"}]})
+
+    async def _statistics(self, request: web.Request) -> web.Response:
+        token = self._token(request)
+        credits = sum(
+            task["credits_reward"] for task in self.catalog
+            if (token, task["task_type"]) in self.completed
+        )
+        return web.json_response({"response": {"total_credits": credits, "leaderboard_rank": 1000}})
+
+    async def _tasks(self, request: web.Request) -> web.Response:
+        body = json.dumps(self._page(request, self.catalog))
+        etag = f'"{hashlib.sha1(body.encode()).hexdigest()}"'
+        if self.etags and request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        headers = {"ETag": etag} if self.etags else {}
+        return web.Response(text=body, content_type="application/json", headers=headers)
+
+    async def _user_available(self, request: web.Request) -> web.Response:
+        token = self._token(request)
+        available = [task for task in self.catalog if (token, task["task_type"]) not in self.completed]
+        return web.json_response(self._page(request, available))
+
+    async def _complete_task(self, request: web.Request) -> web.Response:
+        endpoint = request.path.rsplit('/', 1)[-1]
+        _, category = TASK_ENDPOINTS[endpoint]
+        key = (self._token(request), category)
+        if key in self.completed:
+            return web.json_response({"success": False, "message": "Task already completed"})
+        self.completed.add(key)
+        return web.json_response({"success": True, "message": "Task completed"})
+
+
+async def serve(args):
+    """Запустить сервер до прерывания"""
+    server = MockCryptalServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        missing_endpoints=args.missing,
+        extra_tasks=args.extra_tasks,
+        etags=not args.no_etag,
+        page_total=not args.no_total,
+        seed=args.seed,
+    )
+    await server.start(args.host, args.port)
+    print(f"Mock Cryptal API listening on {server.base_url}")
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock Cryptal API server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='Задержка ответа, секунды')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Разброс задержки, секунды')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Доля ответов HTTP 500 (0..1)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Доля ответов HTTP 429 (0..1)')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After для ответов 429, секунды')
+    parser.add_argument('--missing', nargs='*', default=[], help='Эндпоинты задач, отвечающие 404')
+    parser.add_argument('--extra-tasks', type=int, default=0, help='Дополнительные задачи в каталоге')
+    parser.add_argument('--no-etag', action='store_true', help='Не отдавать ETag для каталога задач')
+    parser.add_argument('--no-total', action='store_true', help='Не передавать total в страницах списков')
+    parser.add_argument('--seed', type=int, default=None)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
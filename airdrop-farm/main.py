@@ -7,37 +7,55 @@ Python версия автобота для выполнения ежеднев
 import asyncio
 import os
 import sys
+import time
 from colorama import Fore, Style
 
 # Добавляем путь к модулям
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from src.core.config_manager import ConfigManager
+from src.core.http_client import SessionPool
+from src.core.journal import RunJournal
+from src.core.metrics import metrics
+from src.core.scheduler import DailyScheduler
 from src.modules.account_manager import AccountManager
 from src.utils.logger import Logger
-from src.utils.display import print_banner
 from src.utils.helpers import delay
 
 class CryptalBot:
     """Основной класс бота Cryptal AI"""
     
-    def __init__(self):
+    def __init__(self, headless: bool = False):
         self.config_manager = ConfigManager()
         self.account_manager = None
         self.config = {}
+        self.headless = headless
+        self.metrics_server = None
+        self.journal = None
     
     async def initialize(self):
         """Инициализация бота"""
         try:
             # Загружаем конфигурацию
             self.config = await self.config_manager.load_config()
+            Logger.configure_from(self.config)
             
             # Создаем менеджер аккаунтов
-            self.account_manager = AccountManager(self.config)
+            self.account_manager = AccountManager(self.config, self.headless)
+            self.journal = RunJournal.from_config(self.config)
             
             # Инициализируем конфигурацию прокси
             await self.config_manager.initialize_proxy_config()
             
+            # Локальный HTTP эндпоинт метрик (если задан порт)
+            metrics_port = self.config.get('metrics', {}).get('http_port')
+            if metrics_port and self.metrics_server is None:
+                try:
+                    self.metrics_server = await metrics.serve(port=metrics_port)
+                    Logger.info(f"Metrics available at http://127.0.0.1:{metrics_port}/metrics", emoji="📈")
+                except OSError as e:
+                    Logger.warn(f"Failed to start metrics endpoint: {e}")
+            
             Logger.info("Bot initialization completed", emoji="✅")
             return True
             
@@ -45,6 +63,25 @@ class CryptalBot:
             Logger.error(f"Failed to initialize bot: {e}", emoji="❌")
             return False
     
+    async def reload_config(self) -> bool:
+        """Применить изменения config.json между циклами (True если конфигурация изменилась)"""
+        previous = self.config
+        if not await self.config_manager.reload_config():
+            return False
+        config = self.config_manager.config
+        try:
+            Logger.configure_from(config)
+            self.account_manager.apply_config(config)
+            self.journal = RunJournal.from_config(config)
+        except Exception:
+            # Компоненты остаются на прежней конфигурации, файл будет перечитан при следующей проверке
+            self.config_manager.rollback_config(previous)
+            Logger.configure_from(previous)
+            self.account_manager.apply_config(previous)
+            raise
+        self.config = config
+        return True
+    
     async def run_cycle(self):
         """Выполнить один цикл обработки всех аккаунтов"""
         try:
@@ -57,17 +94,50 @@ class CryptalBot:
             # Получаем прокси если они используются
             proxies = self.config_manager.get_proxies()
             
+            metrics.start_cycle()
+            cycle_started = time.time()
+            
+            # Общая на цикл сессия: соединения, DNS и TLS переиспользуются между аккаунтами
+            # (открывается при первом аккаунте с прямым соединением)
+            session_pool = SessionPool.from_config(self.config)
+            
             # Обрабатываем аккаунты
-            results = await self.account_manager.process_multiple_accounts(tokens, proxies)
+            try:
+                results = await self.account_manager.process_multiple_accounts(tokens, proxies, session_pool)
+            finally:
+                if session_pool:
+                    await session_pool.close()
+            
+            # Результаты аккаунтов сохраняются в журнал для отчета run.py report
+            if self.journal:
+                try:
+                    self.journal.append_cycle(tokens, results, cycle_started)
+                except OSError as e:
+                    Logger.warn(f"Failed to write run journal: {e}")
             
             # Выводим сводку результатов
             successful_accounts = sum(1 for result in results if result.get('success', False))
             failed_accounts = len(results) - successful_accounts
             
-            Logger.info(
-                f"Cycle completed: {successful_accounts} successful, {failed_accounts} failed accounts",
-                emoji="📊"
-            )
+            summary = f"Cycle completed: {successful_accounts} successful, {failed_accounts} failed accounts"
+            breaker_summary = self.account_manager.circuit_breakers.summary()
+            
+            if self.headless:
+                # Одна строка на цикл: в сводку попадают только не закрытые circuit'ы
+                open_circuits = [line for line in breaker_summary if not line.endswith(': closed')]
+                if open_circuits:
+                    summary += f" | circuits: {', '.join(open_circuits)}"
+                if session_pool:
+                    summary += f" | {session_pool.summary()}"
+                Logger.info(summary, emoji="📊")
+            else:
+                Logger.info(summary, emoji="📊")
+                if breaker_summary:
+                    Logger.info(f"Endpoint circuits: {', '.join(breaker_summary)}", emoji="🔌")
+                if session_pool:
+                    Logger.info(f"Connections: {session_pool.summary()}", emoji="🔗")
+            
+            self.export_metrics()
             
             return True
             
@@ -75,27 +145,53 @@ class CryptalBot:
             Logger.error(f"Error during cycle execution: {e}", emoji="❌")
             return False
     
+    def export_metrics(self):
+        """Записать метрики в файл Prometheus и вывести сводку цикла по эндпоинтам"""
+        metrics_config = self.config.get('metrics', {})
+        
+        if metrics_config.get('summary', True) and not self.headless:
+            for line in metrics.format_cycle_summary():
+                Logger.raw(line)
+        
+        prometheus_file = metrics_config.get('prometheus_file')
+        if prometheus_file:
+            try:
+                metrics.write_prometheus(prometheus_file)
+            except OSError as e:
+                Logger.warn(f"Failed to write metrics to {prometheus_file}: {e}")
+    
     async def run_continuous(self):
         """Запустить бота в непрерывном режиме"""
         cycle_count = 1
+        scheduler = DailyScheduler.from_config(self.config)
+        announced = None
         
         while True:
             try:
+                # Изменения конфигурации применяются между циклами, без перезапуска
+                if await self.reload_config():
+                    scheduler = DailyScheduler.from_config(self.config)
+                
+                # Ждем слот расписания; пропущенный во время простоя слот выполняется сразу
+                wait = scheduler.seconds_until_due()
+                if wait > 0:
+                    next_run = scheduler.next_run_at()
+                    if next_run != announced:
+                        Logger.info(f"Next cycle at {next_run} (in {wait/3600:.1f} hours)", emoji="⏰")
+                        announced = next_run
+                    # Короткие интервалы сна переживают сон системы и подхватывают правки конфигурации
+                    await delay(min(wait, scheduler.max_sleep))
+                    continue
+                
                 Logger.info(f"Starting cycle #{cycle_count}", emoji="🔄")
                 
+                started_at = time.time()
                 success = await self.run_cycle()
                 if not success:
                     Logger.warn("Cycle failed, but continuing...", emoji="⚠️")
                 
-                # Получаем задержку между циклами
-                cycle_delay = self.config.get('delays', {}).get('cycle_delay', 86400)  # 24 часа по умолчанию
-                
-                Logger.info(
-                    f"Cycle #{cycle_count} completed. Waiting {cycle_delay/3600:.1f} hours for next cycle...",
-                    emoji="⏰"
-                )
-                
-                await delay(cycle_delay)
+                scheduler.mark_run(started_at)
+                Logger.info(f"Cycle #{cycle_count} completed", emoji="⏰")
                 cycle_count += 1
                 
             except KeyboardInterrupt:
@@ -106,6 +202,16 @@ class CryptalBot:
                 Logger.info("Retrying in 60 seconds...", emoji="🔄")
                 await delay(60)
     
+    async def run_profiled(self):
+        """Выполнить один цикл под профилировщиком и сохранить результаты в data/profiles/"""
+        from src.utils.profiler import profile_cycle
+        
+        Logger.info("Running one cycle under profiler", emoji="🔬")
+        paths = await profile_cycle(self.run_cycle, include_display=not self.headless)
+        for kind, path in paths.items():
+            Logger.info(f"Profile ({kind}): {path}", emoji="📁")
+        return True
+    
     async def run_once(self):
         """Выполнить бота один раз"""
         try:
@@ -124,14 +230,26 @@ class CryptalBot:
             Logger.error(f"Error in single execution mode: {e}", emoji="❌")
             return False
 
+def is_profile() -> bool:
+    """Режим профилирования одного цикла (PROFILE=1 или --profile)"""
+    return os.getenv('PROFILE', '0').lower() in ('1', 'true', 'yes') or '--profile' in sys.argv[1:]
+
+def is_headless() -> bool:
+    """Headless режим: без баннера, прогресс-баров и таблиц (HEADLESS=1 или --headless)"""
+    return os.getenv('HEADLESS', '0').lower() in ('1', 'true', 'yes') or '--headless' in sys.argv[1:]
+
 async def main():
     """Главная функция"""
     try:
+        headless = is_headless()
+        
         # Выводим баннер
-        print_banner()
+        if not headless:
+            from src.utils.display import print_banner
+            print_banner()
         
         # Создаем и инициализируем бота
-        bot = CryptalBot()
+        bot = CryptalBot(headless)
         
         if not await bot.initialize():
             Logger.error("Bot initialization failed. Exiting.", emoji="❌")
@@ -140,7 +258,9 @@ async def main():
         # Проверяем переменные окружения для режима работы
         run_mode = os.getenv('RUN_MODE', 'continuous').lower()
         
-        if run_mode == 'once':
+        if is_profile():
+            await bot.run_profiled()
+        elif run_mode == 'once':
             await bot.run_once()
         else:
             await bot.run_continuous()
@@ -151,6 +271,7 @@ async def main():
         Logger.error(f"Fatal error: {e}", emoji="💥")
     finally:
         Logger.info("Application shutdown", emoji="🔻")
+        Logger.flush()
 
 if __name__ == "__main__":
     # Проверяем версию Python
@@ -5,6 +5,7 @@
 
 import os
 import sys
+import time
 import argparse
 from colorama import Fore, Style, init
 
@@ -19,10 +20,25 @@ def print_logo():
     print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
     print()
 
+def run_report(args):
+    """Сводка журнала результатов по дням и аккаунтам"""
+    import json
+    from src.core.journal import RunJournal, aggregate, format_report
+    
+    config = {}
+    if os.path.exists(args.config):
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    journal = RunJournal.from_config(config) or RunJournal()
+    if args.journal:
+        journal.path = args.journal
+    
+    since = time.time() - args.days * 86400 if args.days else None
+    for line in format_report(aggregate(journal.iter_records(since)), show_accounts=not args.no_accounts):
+        print(line)
+
 def main():
     """Главная функция"""
-    print_logo()
-    
     # Настройка аргументов командной строки
     parser = argparse.ArgumentParser(description='NT EXHAUST - CRYPTAL AI Auto Bot')
     parser.add_argument('--mode', choices=['continuous', 'once'], default='continuous',
@@ -31,9 +47,27 @@ def main():
                        help='Отключить использование прокси')
     parser.add_argument('--config', default='config.json',
                        help='Путь к файлу конфигурации')
+    parser.add_argument('--headless', action='store_true',
+                       help='Без баннера, прогресс-баров и таблиц: одна строка-сводка на аккаунт и цикл')
+    parser.add_argument('--profile', action='store_true',
+                       help='Выполнить один цикл под профилировщиком, результаты в data/profiles/')
+    
+    subparsers = parser.add_subparsers(dest='command')
+    report_parser = subparsers.add_parser('report', help='Сводка журнала результатов аккаунтов по дням')
+    report_parser.add_argument('--days', type=int, default=14,
+                              help='За сколько последних дней строить отчет (0 - вся история)')
+    report_parser.add_argument('--journal', help='Путь к журналу (по умолчанию journal.path из конфигурации)')
+    report_parser.add_argument('--no-accounts', action='store_true', help='Не выводить таблицу по аккаунтам')
     
     args = parser.parse_args()
     
+    if args.command == 'report':
+        run_report(args)
+        return
+    
+    if not args.headless:
+        print_logo()
+    
     # Проверка версии Python
     if sys.version_info < (3, 7):
         print(f"{Fore.RED}❌ Ошибка: Требуется Python 3.7+. Текущая версия: {sys.version}{Style.RESET_ALL}")
@@ -59,6 +93,12 @@ def main():
     if args.no_proxy:
         os.environ['NO_PROXY'] = '1'
     
+    if args.headless:
+        os.environ['HEADLESS'] = '1'
+    
+    if args.profile:
+        os.environ['PROFILE'] = '1'
+    
     # Информация о запуске
     print(f"{Fore.GREEN}🚀 Запуск бота в режиме: {args.mode}{Style.RESET_ALL}")
     print(f"{Fore.GREEN}📁 Конфигурация: {args.config}{Style.RESET_ALL}")
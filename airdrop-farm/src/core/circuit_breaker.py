@@ -0,0 +1,107 @@
+from typing import Dict, List
+from urllib.parse import urlparse
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Circuit breaker одного эндпоинта, общий для всех аккаунтов цикла"""
+
+    def __init__(self, failure_threshold: int = 3):
+        self.failure_threshold = max(1, failure_threshold)
+        self.state = CLOSED
+        self.failures = 0
+        self.skipped = 0
+        self.probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Проверить, можно ли отправить запрос"""
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self.probe_in_flight:
+            # Пробный запрос после паузы в один цикл
+            self.probe_in_flight = True
+            return True
+        self.skipped += 1
+        return False
+
+    def record_success(self):
+        """Учесть успешный запрос"""
+        self.state = CLOSED
+        self.failures = 0
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        """Учесть неудачный запрос"""
+        self.failures += 1
+        self.probe_in_flight = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+
+    def release(self):
+        """Запрос завершился без оценки эндпоинта (например, 401 аккаунта): освободить пробу"""
+        self.probe_in_flight = False
+
+    def start_cycle(self):
+        """Новый цикл: открытый breaker переходит в half-open для пробы"""
+        self.skipped = 0
+        self.probe_in_flight = False
+        if self.state == OPEN:
+            self.state = HALF_OPEN
+        elif self.state == CLOSED:
+            self.failures = 0
+
+
+class CircuitBreakerRegistry:
+    """Реестр circuit breaker'ов по эндпоинтам"""
+
+    def __init__(self, failure_threshold: int = 3):
+        self.failure_threshold = failure_threshold
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    @classmethod
+    def from_config(cls, config: dict) -> "CircuitBreakerRegistry":
+        """Создать реестр из секции circuit_breaker конфигурации"""
+        settings = config.get('circuit_breaker', {})
+        return cls(failure_threshold=settings.get('failure_threshold', 3))
+
+    @staticmethod
+    def endpoint(url: str) -> str:
+        """Ключ эндпоинта: путь без хоста и query-параметров"""
+        return urlparse(url).path
+
+    def get(self, url: str) -> CircuitBreaker:
+        """Получить breaker для URL"""
+        key = self.endpoint(url)
+        if key not in self.breakers:
+            self.breakers[key] = CircuitBreaker(self.failure_threshold)
+        return self.breakers[key]
+
+    def allow(self, url: str) -> bool:
+        return self.get(url).allow()
+
+    def record_success(self, url: str):
+        self.get(url).record_success()
+
+    def record_failure(self, url: str):
+        self.get(url).record_failure()
+
+    def release(self, url: str):
+        self.get(url).release()
+
+    def start_cycle(self):
+        """Начать новый цикл для всех breaker'ов"""
+        for breaker in self.breakers.values():
+            breaker.start_cycle()
+
+    def summary(self) -> List[str]:
+        """Строки состояния breaker'ов для сводки цикла"""
+        lines = []
+        for endpoint, breaker in sorted(self.breakers.items()):
+            line = f"{endpoint.rsplit('/', 1)[-1]}: {breaker.state}"
+            if breaker.state != CLOSED:
+                line += f" ({breaker.failures} failures, {breaker.skipped} skipped)"
+            lines.append(line)
+        return lines
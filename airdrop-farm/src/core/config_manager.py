@@ -1,7 +1,10 @@
+import hashlib
 import json
 import os
-from typing import List, Dict, Any
-from ..utils.helpers import read_file_lines, load_config
+from typing import List, Dict, Any, Optional, Tuple
+from .config_schema import ConfigError, validate_config
+from .token_validator import TokenValidator
+from ..utils.helpers import read_file_lines
 from ..utils.logger import Logger
 
 class ConfigManager:
@@ -11,22 +14,90 @@ class ConfigManager:
         self.config_path = config_path
         self.config = {}
         self.tokens = []
+        self.raw_tokens = []
         self.proxies = []
         self.use_proxy = False
+        self.token_validator = None
+        # Подписи прочитанных файлов: путь -> ((mtime_ns, размер), sha256)
+        self._signatures: Dict[str, Tuple[Tuple[int, int], str]] = {}
+    
+    def _read_if_changed(self, path: str) -> Optional[bytes]:
+        """Прочитать файл, если он изменился с прошлого чтения (None - без изменений).
+        
+        Сначала сравниваются mtime и размер, содержимое хэшируется только если они изменились:
+        сохранение файла без правок не вызывает перезагрузку.
+        """
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        previous = self._signatures.get(path)
+        if previous and previous[0] == stamp:
+            return None
+        with open(path, 'rb') as f:
+            data = f.read()
+        checksum = hashlib.sha256(data).hexdigest()
+        self._signatures[path] = (stamp, checksum)
+        if previous and previous[1] == checksum:
+            return None
+        return data
+    
+    def _parse_config(self, data: bytes) -> Dict[str, Any]:
+        """Разобрать и проверить конфигурацию, дополнив ее значениями по умолчанию"""
+        try:
+            raw = json.loads(data)
+        except ValueError as e:
+            raise ConfigError([f"invalid JSON: {e}"])
+        return validate_config(raw, self._get_default_config())
     
     async def load_config(self) -> Dict[str, Any]:
         """Загрузить основную конфигурацию"""
         try:
-            self.config = await load_config(self.config_path)
-            if not self.config:
-                Logger.error(f"Failed to load config from {self.config_path}")
-                # Используем конфигурацию по умолчанию
-                self.config = self._get_default_config()
-            return self.config
-        except Exception as e:
-            Logger.error(f"Error loading config: {e}")
-            self.config = self._get_default_config()
+            self._signatures.pop(self.config_path, None)
+            self.config = self._parse_config(self._read_if_changed(self.config_path))
             return self.config
+        except OSError as e:
+            Logger.error(f"Failed to load config from {self.config_path}: {e}")
+        except ConfigError as e:
+            Logger.error(f"Invalid config {self.config_path}: {e}")
+        # Используем конфигурацию по умолчанию
+        self.config = self._get_default_config()
+        return self.config
+    
+    async def reload_config(self) -> bool:
+        """Перечитать конфигурацию, если файл изменился; при ошибке остается последняя рабочая.
+        
+        Возвращает True, если применена новая конфигурация.
+        """
+        try:
+            data = self._read_if_changed(self.config_path)
+        except OSError as e:
+            Logger.warn(f"Cannot read {self.config_path}, keeping current configuration: {e}")
+            return False
+        if data is None:
+            return False
+        
+        try:
+            config = self._parse_config(data)
+        except ConfigError as e:
+            for error in e.errors:
+                Logger.error(f"Invalid config {self.config_path}: {error}")
+            Logger.warn("Keeping last good configuration", emoji="⚠️")
+            return False
+        
+        if config == self.config:
+            return False
+        self.config = config
+        if self.token_validator is not None:
+            self.token_validator = TokenValidator.from_config(config)
+        Logger.info(f"Configuration reloaded from {self.config_path}", emoji="🔄")
+        return True
+    
+    def rollback_config(self, previous: Dict[str, Any]):
+        """Отменить перезагрузку, которую не удалось применить: вернуть прежнюю конфигурацию
+        и забыть подпись файла, чтобы следующая проверка снова прочитала его"""
+        self.config = previous
+        self._signatures.pop(self.config_path, None)
+        if self.token_validator is not None:
+            self.token_validator = TokenValidator.from_config(previous)
     
     def _get_default_config(self) -> Dict[str, Any]:
         """Получить конфигурацию по умолчанию"""
@@ -40,13 +111,66 @@ class ConfigManager:
                 "base_url": "https://api.cryptal.ai",
                 "timeout": 60,
                 "retries": 3,
-                "backoff_factor": 1.5
+                "backoff_factor": 1.5,
+                "backoff_base": 1.0,
+                "max_backoff": 30,
+                "max_retry_after": 120,
+                "rate_limit": {
+                    "requests_per_second": 5,
+                    "burst": 10
+                },
+                "page_size": 100,
+                "fast_json": True,
+                "connection": {
+                    "shared_session": True,
+                    "keepalive_timeout": 60,
+                    "dns_cache_ttl": 300,
+                    "limit_per_host": 10
+                },
+                "ip_lookup": False,
+                "ip_url": "https://api.ipify.org?format=json"
             },
             "delays": {
                 "between_accounts": 5,
                 "between_tasks": 2,
                 "cycle_delay": 86400
             },
+            "circuit_breaker": {
+                "failure_threshold": 3
+            },
+            "state": {
+                "enabled": True,
+                "path": "data/state.db",
+                "reset_hour_utc": 0
+            },
+            "tokens": {
+                "validate_jwt": True,
+                "expiry_leeway_seconds": 60,
+                "quarantine_after": 3,
+                "quarantine_hours": 24
+            },
+            "journal": {
+                "enabled": True,
+                "path": "data/journal/runs.jsonl",
+                "max_bytes": 5242880,
+                "backup_count": 10
+            },
+            "logging": {
+                "level": "INFO",
+                "json_file": "data/logs/bot.jsonl",
+                "flush_interval": 0.5,
+                "batch_size": 200
+            },
+            "metrics": {
+                "prometheus_file": "data/metrics.prom",
+                "http_port": 0,
+                "summary": True
+            },
+            "schedule": {
+                "run_at_utc": None,
+                "reset_margin_minutes": 5,
+                "state_file": "data/schedule.json"
+            },
             "headers": {
                 "accept": "application/json",
                 "cache_control": "no-cache",
@@ -62,18 +186,58 @@ class ConfigManager:
         }
     
     async def load_tokens(self, tokens_file: str = "data/token.txt") -> List[str]:
-        """Загрузить токены из файла"""
+        """Загрузить токены из файла (перечитывается только при изменении файла)"""
         try:
-            self.tokens = await read_file_lines(tokens_file)
-            if self.tokens:
-                Logger.info(f"Loaded {len(self.tokens)} token{'s' if len(self.tokens) != 1 else ''}", emoji="📄")
-            else:
+            if not os.path.exists(tokens_file):
+                self._signatures.pop(tokens_file, None)
+                self.raw_tokens = []
                 Logger.warn(f"No tokens found in {tokens_file}", emoji="⚠️")
+                return []
+            
+            data = self._read_if_changed(tokens_file)
+            if data is not None:
+                lines = [line.strip() for line in data.decode('utf-8').split('\n') if line.strip()]
+                self._apply_token_diff(lines)
+            
+            self.tokens = list(self.raw_tokens)
+            
+            # Истекшие и битые JWT отсеиваем локально, до сетевых запросов
+            if self.tokens and self.config.get('tokens', {}).get('validate_jwt', True):
+                if self.token_validator is None:
+                    self.token_validator = TokenValidator.from_config(self.config)
+                usable = self.token_validator.filter(self.tokens)
+                if len(usable) != len(self.tokens):
+                    Logger.warn(f"Skipping {len(self.tokens) - len(usable)} expired or malformed token(s)", emoji="⚠️")
+                self.tokens = usable
             return self.tokens
         except Exception as e:
             Logger.error(f"Failed to read tokens from {tokens_file}: {e}", emoji="❌")
             return []
     
+    def _apply_token_diff(self, lines: List[str]):
+        """Применить изменения файла токенов: состояние неизмененных токенов сохраняется"""
+        first_load = not self.raw_tokens
+        previous = set(self.raw_tokens)
+        current = set(lines)
+        added = current - previous
+        removed = previous - current
+        self.raw_tokens = lines
+        
+        if self.token_validator is not None and removed:
+            self.token_validator.forget(removed)
+        
+        if first_load:
+            if lines:
+                Logger.info(f"Loaded {len(lines)} token{'s' if len(lines) != 1 else ''}", emoji="📄")
+            else:
+                Logger.warn("No tokens found in token file", emoji="⚠️")
+        elif added or removed:
+            Logger.info(
+                f"Token file changed: {len(added)} added, {len(removed)} removed, "
+                f"{len(current & previous)} unchanged",
+                emoji="📄"
+            )
+    
     async def load_proxies(self, proxies_file: str = "data/proxy.txt") -> List[str]:
         """Загрузить прокси из файла"""
         try:
@@ -0,0 +1,153 @@
+import copy
+import math
+from typing import Dict, Any, List, Optional, Tuple
+from ..utils.logger import LEVELS
+
+# Секции, которые заменяются целиком, а не объединяются с конфигурацией по умолчанию
+REPLACED_SECTIONS = {('headers',)}
+
+# Ключи, которые можно отключить значением null
+NULLABLE = {
+    ('logging', 'json_file'),
+    ('metrics', 'prometheus_file'),
+    ('schedule', 'state_file'),
+}
+
+# Числовые ключи с целым значением по умолчанию, для которых допустимы дробные значения (секунды)
+FRACTIONAL = {
+    ('api', 'timeout'),
+    ('api', 'max_backoff'),
+    ('api', 'max_retry_after'),
+    ('api', 'rate_limit', 'requests_per_second'),
+    ('api', 'rate_limit', 'burst'),
+    ('api', 'connection', 'keepalive_timeout'),
+    ('delays', 'between_accounts'),
+    ('delays', 'between_tasks'),
+    ('delays', 'cycle_delay'),
+    ('tokens', 'expiry_leeway_seconds'),
+    ('tokens', 'quarantine_hours'),
+}
+
+# Ограничения значений: путь -> (минимум, максимум), границы включительно, None - без границы
+LIMITS: Dict[Tuple[str, ...], Tuple[Optional[float], Optional[float]]] = {
+    ('api', 'timeout'): (1, None),
+    ('api', 'retries'): (1, None),
+    ('api', 'backoff_factor'): (1, None),
+    ('api', 'backoff_base'): (0, None),
+    ('api', 'max_backoff'): (0, None),
+    ('api', 'max_retry_after'): (0, None),
+    ('api', 'rate_limit', 'requests_per_second'): (0, None),
+    ('api', 'rate_limit', 'burst'): (1, None),
+    ('api', 'page_size'): (1, None),
+    ('api', 'connection', 'keepalive_timeout'): (0, None),
+    ('api', 'connection', 'dns_cache_ttl'): (0, None),
+    ('api', 'connection', 'limit_per_host'): (1, None),
+    ('delays', 'between_accounts'): (0, None),
+    ('delays', 'between_tasks'): (0, None),
+    ('delays', 'cycle_delay'): (0, None),
+    ('circuit_breaker', 'failure_threshold'): (1, None),
+    ('state', 'reset_hour_utc'): (0, 23),
+    ('tokens', 'expiry_leeway_seconds'): (0, None),
+    ('tokens', 'quarantine_after'): (1, None),
+    ('tokens', 'quarantine_hours'): (0, None),
+    ('journal', 'max_bytes'): (1024, None),
+    ('journal', 'backup_count'): (0, None),
+    ('logging', 'flush_interval'): (0, None),
+    ('logging', 'batch_size'): (1, None),
+    ('metrics', 'http_port'): (0, 65535),
+    ('schedule', 'reset_margin_minutes'): (0, 1439),
+}
+
+
+class ConfigError(Exception):
+    """Конфигурация не прошла проверку схемы"""
+
+    def __init__(self, errors: List[str]):
+        super().__init__('; '.join(errors))
+        self.errors = errors
+
+
+def _type_name(value: Any) -> str:
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, int):
+        return 'integer'
+    if isinstance(value, float):
+        return 'number'
+    if isinstance(value, str):
+        return 'string'
+    if isinstance(value, list):
+        return 'list'
+    if isinstance(value, dict):
+        return 'object'
+    return 'null' if value is None else type(value).__name__
+
+
+def _merge(defaults: Any, value: Any, path: Tuple[str, ...], errors: List[str]) -> Any:
+    """Проверить значение по типу значения по умолчанию и дополнить отсутствующие ключи"""
+    name = '.'.join(path)
+
+    # null в значении по умолчанию - ключ необязательный и без фиксированного типа
+    if defaults is None or (value is None and path in NULLABLE):
+        return value
+
+    expected = _type_name(defaults)
+    actual = _type_name(value)
+    # Целое подходит для дробного ключа; дробное для целого - только для ключей из FRACTIONAL
+    if expected == 'number' or path in FRACTIONAL:
+        expected = 'number' if expected == 'integer' else expected
+        actual = 'number' if actual == 'integer' else actual
+    if expected != actual:
+        errors.append(f"{name}: expected {expected}, got {actual}")
+        return defaults
+
+    if isinstance(defaults, dict) and path not in REPLACED_SECTIONS:
+        merged = copy.deepcopy(defaults)
+        for key, item in value.items():
+            merged[key] = _merge(defaults[key], item, path + (key,), errors) if key in defaults else item
+        return merged
+
+    if isinstance(value, float) and not math.isfinite(value):
+        errors.append(f"{name}: must be a finite number, got {value}")
+        return value
+    if path in LIMITS:
+        minimum, maximum = LIMITS[path]
+        if minimum is not None and value < minimum:
+            errors.append(f"{name}: must be >= {minimum:g}, got {value:g}")
+        elif maximum is not None and value > maximum:
+            errors.append(f"{name}: must be <= {maximum:g}, got {value:g}")
+    return value
+
+
+def validate_config(raw: Any, defaults: Dict[str, Any]) -> Dict[str, Any]:
+    """Проверить конфигурацию по схеме (типы берутся из конфигурации по умолчанию).
+
+    Возвращает конфигурацию, дополненную значениями по умолчанию, или бросает ConfigError
+    со списком всех найденных ошибок.
+    """
+    if not isinstance(raw, dict):
+        raise ConfigError([f"config: expected object, got {_type_name(raw)}"])
+
+    errors: List[str] = []
+    config = _merge(defaults, raw, (), errors)
+
+    user_agents = config.get('user_agents')
+    if not user_agents or not all(isinstance(agent, str) and agent for agent in user_agents):
+        errors.append("user_agents: expected non-empty list of strings")
+    level = config.get('logging', {}).get('level')
+    if isinstance(level, str) and level.upper() not in LEVELS:
+        errors.append(f"logging.level: expected one of {', '.join(LEVELS)}, got {level!r}")
+    run_at = config.get('schedule', {}).get('run_at_utc')
+    if run_at is not None and not _valid_time(run_at):
+        errors.append(f"schedule.run_at_utc: expected HH:MM, got {run_at!r}")
+
+    if errors:
+        raise ConfigError(errors)
+    return config
+
+
+def _valid_time(value: Any) -> bool:
+    if not isinstance(value, str) or ':' not in value:
+        return False
+    hours, _, minutes = value.partition(':')
+    return hours.isdigit() and minutes.isdigit() and int(hours) < 24 and int(minutes) < 60
@@ -1,21 +1,157 @@
-import aiohttp
 import asyncio
 import random
-from typing import Optional, Dict, Any, Union
+import time
+from typing import Optional, Dict, Any, Union, AsyncIterator, Callable
 from urllib.parse import urlparse
-import socks
-from aiohttp_socks import ProxyConnector
+from .metrics import metrics, endpoint_label
+from .models import ResponseFormatError, json_loads, parse_page, parse_page_total, parse_ip
+from .rate_limiter import RateLimiter, is_retryable_status, parse_retry_after, backoff_delay
 from ..utils.logger import Logger
 from ..utils.helpers import get_random_user_agent, delay
 
+def _item_id(item: Any) -> Any:
+    """Идентификатор элемента страницы: модель, объект API или сам id"""
+    if isinstance(item, dict):
+        return item.get('id')
+    return getattr(item, 'id', item)
+
+
+class SessionPool:
+    """Общая на цикл HTTP сессия для прямых соединений.
+    
+    Один коннектор на все аккаунты без прокси: keep-alive соединения, кэш DNS и один
+    SSL контекст, так что TCP/TLS рукопожатия к API выполняются один раз за цикл, а не
+    для каждого аккаунта. Аккаунты с прокси по-прежнему получают собственные сессии.
+    """
+    
+    def __init__(
+        self,
+        timeout: float = 60,
+        keepalive_timeout: float = 60,
+        dns_cache_ttl: int = 300,
+        limit_per_host: int = 10
+    ):
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.limit_per_host = limit_per_host
+        self.session = None
+        self.stats = {'connections': 0, 'reused': 0, 'dns_lookups': 0, 'dns_cache_hits': 0}
+    
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["SessionPool"]:
+        """Создать пул из секции api.connection конфигурации (None если общая сессия отключена)"""
+        api_config = config.get('api', {})
+        settings = api_config.get('connection', {})
+        if not settings.get('shared_session', True):
+            return None
+        return cls(
+            timeout=api_config.get('timeout', 60),
+            keepalive_timeout=settings.get('keepalive_timeout', 60),
+            dns_cache_ttl=settings.get('dns_cache_ttl', 300),
+            limit_per_host=settings.get('limit_per_host', 10)
+        )
+    
+    async def __aenter__(self):
+        await self.open()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+    
+    def _count(self, key: str, metric: str, labels: Dict[str, str]):
+        self.stats[key] += 1
+        metrics.inc(metric, labels)
+    
+    def _trace_config(self):
+        import aiohttp
+        
+        async def on_connection_create_end(session, ctx, params):
+            self._count('connections', 'cryptal_http_connections_total', {'kind': 'new'})
+        
+        async def on_connection_reuseconn(session, ctx, params):
+            self._count('reused', 'cryptal_http_connections_total', {'kind': 'reused'})
+        
+        async def on_dns_resolvehost_end(session, ctx, params):
+            self._count('dns_lookups', 'cryptal_dns_lookups_total', {'result': 'resolved'})
+        
+        async def on_dns_cache_hit(session, ctx, params):
+            self._count('dns_cache_hits', 'cryptal_dns_lookups_total', {'result': 'cache_hit'})
+        
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        return trace_config
+    
+    async def open(self):
+        """Создать общий коннектор и сессию"""
+        import ssl
+        import aiohttp
+        
+        if self.session is not None:
+            return
+        connector = aiohttp.TCPConnector(
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            # Один SSL контекст на цикл: хранилище сертификатов загружается один раз
+            ssl=ssl.create_default_context()
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            # Cookies одного аккаунта не должны попадать в запросы другого
+            cookie_jar=aiohttp.DummyCookieJar(),
+            trace_configs=[self._trace_config()]
+        )
+    
+    async def close(self):
+        """Закрыть сессию и все keep-alive соединения"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+    
+    async def session_for(self, proxy: Optional[str]):
+        """Общая сессия для прямого соединения (None для аккаунтов с прокси).
+        
+        Сессия открывается при первом запросе: если все аккаунты цикла пропущены или
+        идут через прокси, SSL контекст и коннектор не создаются.
+        """
+        if proxy:
+            return None
+        await self.open()
+        return self.session
+    
+    def summary(self) -> str:
+        """Строка статистики соединений за цикл"""
+        return (
+            f"{self.stats['connections']} new connections, {self.stats['reused']} reused, "
+            f"{self.stats['dns_lookups']} DNS lookups, {self.stats['dns_cache_hits']} DNS cache hits"
+        )
+
+
 class HttpClient:
     """HTTP клиент с поддержкой прокси и повторных попыток"""
     
-    def __init__(self, config: dict, proxy: Optional[str] = None):
+    def __init__(
+        self,
+        config: dict,
+        proxy: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        session=None
+    ):
         self.config = config
         self.proxy = proxy
-        self.session = None
-        self.timeout = aiohttp.ClientTimeout(total=config.get('api', {}).get('timeout', 60))
+        self.rate_limiter = rate_limiter or RateLimiter.from_config(config)
+        # Внешняя (общая) сессия не создается и не закрывается клиентом
+        self.session = session
+        self.owns_session = session is None
+        self.timeout = config.get('api', {}).get('timeout', 60)
+        # Сервер отклонил токен (401) хотя бы один раз за время жизни клиента
+        self.unauthorized = False
         
     async def __aenter__(self):
         await self.create_session()
@@ -26,12 +162,20 @@ class HttpClient:
     
     async def create_session(self):
         """Создать HTTP сессию"""
+        if not self.owns_session:
+            return
+        
+        # aiohttp импортируется при первом создании сессии, а не при старте приложения
+        import aiohttp
+        
         connector = None
         
         if self.proxy:
             try:
                 # Определяем тип прокси
                 if self.proxy.startswith(('socks4://', 'socks5://')):
+                    # SOCKS коннектор нужен только при настроенном SOCKS прокси
+                    from aiohttp_socks import ProxyConnector
                     connector = ProxyConnector.from_url(self.proxy)
                 elif self.proxy.startswith(('http://', 'https://')):
                     connector = aiohttp.TCPConnector()
@@ -46,12 +190,12 @@ class HttpClient:
         
         self.session = aiohttp.ClientSession(
             connector=connector,
-            timeout=self.timeout
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
         )
     
     async def close_session(self):
         """Закрыть HTTP сессию"""
-        if self.session:
+        if self.session and self.owns_session:
             await self.session.close()
     
     def get_headers(self, token: Optional[str] = None, use_global_headers: bool = True) -> Dict[str, str]:
@@ -81,19 +225,42 @@ class HttpClient:
         use_global_headers: bool = True,
         context: str = "",
         retries: Optional[int] = None,
-        backoff_factor: Optional[float] = None
+        backoff_factor: Optional[float] = None,
+        extra_headers: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
-        """Выполнить HTTP запрос с повторными попытками"""
+        """Выполнить HTTP запрос с повторными попытками.
+        
+        Повторяются только таймауты, сетевые ошибки, 429 и 5xx. Ответ 200 с некорректным
+        JSON не повторяется и поднимает ResponseFormatError.
+        """
+        import aiohttp
         
+        api_config = self.config.get('api', {})
         if retries is None:
-            retries = self.config.get('api', {}).get('retries', 3)
+            retries = api_config.get('retries', 3)
         if backoff_factor is None:
-            backoff_factor = self.config.get('api', {}).get('backoff_factor', 1.5)
+            backoff_factor = api_config.get('backoff_factor', 1.5)
+        backoff_base = api_config.get('backoff_base', 1.0)
+        max_backoff = api_config.get('max_backoff', 30)
+        max_retry_after = api_config.get('max_retry_after', 120)
+        fast_json = api_config.get('fast_json', True)
         
         headers = self.get_headers(token, use_global_headers)
-        backoff = 2.0
+        if extra_headers:
+            headers.update(extra_headers)
+        
+        started = time.perf_counter()
         
         for attempt in range(retries):
+            result = None
+            retry_after = None
+            
+            await self.rate_limiter.acquire(url)
+            
+            attempt_started = time.perf_counter()
+            status_label = 'error'
+            received = 0
+            
             try:
                 kwargs = {
                     'headers': headers,
@@ -104,32 +271,85 @@ class HttpClient:
                     kwargs['json'] = payload
                 
                 async with self.session.request(method.upper(), url, **kwargs) as response:
+                    status_label = str(response.status)
+                    self.rate_limiter.update(url, response.headers)
+                    
                     if response.status == 200:
-                        data = await response.json()
-                        return {'success': True, 'response': data}
+                        body = await response.read()
+                        received = len(body)
+                        try:
+                            data = json_loads(body, fast_json)
+                        except ValueError as e:
+                            # Сервер уже обработал запрос: повтор отправил бы действие еще раз
+                            raise ResponseFormatError(f"{method.upper()} {endpoint_label(url)}: invalid JSON body: {e}") from e
+                        return {'success': True, 'response': data, 'status': 200, 'headers': response.headers}
+                    elif response.status == 304:
+                        # Условный запрос: данные на стороне клиента актуальны
+                        return {'success': True, 'response': None, 'status': 304, 'headers': response.headers}
                     elif response.status == 404:
                         return {'success': False, 'message': 'Task endpoint not found', 'status': 404}
-                    else:
-                        error_text = await response.text()
-                        return {'success': False, 'message': f'HTTP {response.status}: {error_text}', 'status': response.status}
+                    
+                    received = len(await response.read())
+                    error_text = await response.text()
+                    error_msg = f'HTTP {response.status}: {error_text}'
+                    result = {'success': False, 'message': error_msg, 'status': response.status}
+                    
+                    # Остальные 4xx сервер отклонит и при повторе
+                    if not is_retryable_status(response.status):
+                        if response.status == 401:
+                            self.unauthorized = True
+                        return result
+                    
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    # Слишком долгий Retry-After - запрос прекращается, хост не блокируется
+                    if retry_after is not None and retry_after <= max_retry_after:
+                        self.rate_limiter.block(url, min(retry_after, max_retry_after))
                         
             except asyncio.TimeoutError:
+                status_label = 'timeout'
                 error_msg = "Request timeout"
             except aiohttp.ClientError as e:
                 error_msg = f"Client error: {str(e)}"
-            except Exception as e:
-                error_msg = f"Unexpected error: {str(e)}"
+            finally:
+                self._record_attempt(url, attempt, status_label, received, time.perf_counter() - attempt_started)
             
             if attempt < retries - 1:
-                Logger.warn(f"Retrying {method.upper()} {url} ({attempt + 1}/{retries})", emoji="🔄", context=context)
-                await delay(backoff)
-                backoff *= backoff_factor
+                if retry_after is not None and retry_after > max_retry_after:
+                    Logger.error(
+                        f"Server asked to retry {method.upper()} {url} after {retry_after:.0f}s, giving up",
+                        context=context
+                    )
+                    return result
+                
+                # Retry-After уже учтен блокировкой хоста в rate limiter
+                wait = 0 if retry_after is not None else backoff_delay(attempt, backoff_base, backoff_factor, max_backoff)
+                Logger.warn(
+                    f"Retrying {method.upper()} {url} ({attempt + 1}/{retries})",
+                    emoji="🔄", context=context, endpoint=url, attempt=attempt + 1,
+                    status=result['status'] if result else None
+                )
+                await delay(wait)
             else:
-                Logger.error(f"Request failed after {retries} attempts: {error_msg}", context=context)
-                return {'success': False, 'message': error_msg}
+                Logger.error(
+                    f"Request failed after {retries} attempts: {error_msg}",
+                    context=context, endpoint=url,
+                    latency_ms=round((time.perf_counter() - started) * 1000, 1)
+                )
+                return result or {'success': False, 'message': error_msg}
         
         return {'success': False, 'message': 'Max retries exceeded'}
     
+    @staticmethod
+    def _record_attempt(url: str, attempt: int, status: str, received: int, elapsed: float):
+        """Записать метрики одной попытки запроса"""
+        labels = {'endpoint': endpoint_label(url)}
+        metrics.observe('cryptal_http_request_duration_seconds', elapsed, labels)
+        metrics.inc('cryptal_http_responses_total', {**labels, 'status': status})
+        if attempt > 0:
+            metrics.inc('cryptal_http_retries_total', labels)
+        if received:
+            metrics.inc('cryptal_http_received_bytes_total', labels, received)
+    
     async def get(self, url: str, token: Optional[str] = None, context: str = "") -> Dict[str, Any]:
         """Выполнить GET запрос"""
         return await self.request_with_retry('GET', url, token=token, context=context)
@@ -138,19 +358,98 @@ class HttpClient:
         """Выполнить POST запрос"""
         return await self.request_with_retry('POST', url, payload=payload, token=token, context=context)
     
-    async def get_public_ip(self, context: str = "") -> str:
-        """Получить публичный IP адрес"""
+    async def paginate(
+        self,
+        url: str,
+        token: Optional[str] = None,
+        context: str = "",
+        page_size: int = 100,
+        cache: Optional[Dict[int, Dict[str, Any]]] = None,
+        parse: Optional[Callable[[Any], Any]] = None,
+        max_pages: int = 1000
+    ) -> AsyncIterator[Any]:
+        """Постранично обойти список take/skip и отдавать элементы по мере разбора страниц.
+        
+        Если конверт содержит total, обход идет до skip >= total (сервер может отдавать меньше
+        take элементов); без total последней считается неполная страница. Страница, повторяющая
+        первый элемент предыдущей, и превышение max_pages прерывают обход ResponseFormatError.
+        parse преобразует элемент в модель. Если передан cache (skip -> страница), страницы
+        запрашиваются условно по ETag / Last-Modified, а при 304 берутся из кэша.
+        """
+        separator = '&' if '?' in url else '?'
+        endpoint = endpoint_label(url)
+        skip = 0
+        previous_first = None
+        for _ in range(max_pages):
+            cached = cache.get(skip) if cache is not None else None
+            headers = {}
+            if cached:
+                if cached.get('etag'):
+                    headers['If-None-Match'] = cached['etag']
+                if cached.get('last_modified'):
+                    headers['If-Modified-Since'] = cached['last_modified']
+            
+            response = await self.request_with_retry(
+                'GET', f"{url}{separator}take={page_size}&skip={skip}",
+                token=token, context=context, extra_headers=headers
+            )
+            if not response['success']:
+                raise Exception(f"Failed to fetch page at skip={skip}")
+            
+            if response.get('status') == 304 and cached:
+                items, total = cached['items'], cached['total']
+            else:
+                payload = response.get('response')
+                items = parse_page(payload, endpoint)
+                total = parse_page_total(payload)
+                if parse is not None:
+                    items = [parse(item) for item in items]
+                if cache is not None:
+                    response_headers = response.get('headers') or {}
+                    cache[skip] = {
+                        'items': items,
+                        'total': total,
+                        'etag': response_headers.get('ETag'),
+                        'last_modified': response_headers.get('Last-Modified'),
+                    }
+            
+            # Сервер, игнорирующий skip, отдавал бы одну и ту же страницу бесконечно
+            first = _item_id(items[0]) if items else None
+            if skip and first is not None and first == previous_first:
+                raise ResponseFormatError(f"{endpoint}: page at skip={skip} repeats the previous page")
+            previous_first = first
+            
+            for item in items:
+                yield item
+            
+            if total is not None:
+                last = not items or skip + len(items) >= total
+            else:
+                last = len(items) < page_size
+            if last:
+                if cache is not None:
+                    # Страницы за концом списка больше не актуальны
+                    for stale in [key for key in cache if key > skip]:
+                        del cache[stale]
+                return
+            skip += len(items)
+        
+        raise ResponseFormatError(f"{endpoint}: more than {max_pages} pages")
+    
+    async def get_public_ip(self, context: str = "") -> Optional[str]:
+        """Получить публичный IP адрес одной попыткой (None при ошибке)"""
         try:
+            ip_url = self.config.get('api', {}).get('ip_url', 'https://api.ipify.org?format=json')
             result = await self.request_with_retry(
                 'GET', 
-                'https://api.ipify.org?format=json',
+                ip_url,
                 use_global_headers=False,
-                context=context
+                context=context,
+                retries=1
             )
             if result['success']:
-                return result['response'].get('ip', 'Unknown')
-            else:
-                return 'Error retrieving IP'
+                return parse_ip(result['response'])
+            return None
         except Exception as e:
-            Logger.error(f"Failed to get IP: {e}", emoji="❌", context=context)
-            return 'Error retrieving IP'
\ No newline at end of file
+            Logger.warn(f"Failed to get IP: {e}", context=context)
+            return None
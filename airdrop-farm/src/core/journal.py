@@ -0,0 +1,226 @@
+import datetime
+import json
+import math
+import os
+import time
+from typing import Dict, Any, Optional, List, Iterator
+from .models import json_loads
+from .state_store import account_key
+
+
+def _status(result: Dict[str, Any]) -> str:
+    """Итог обработки аккаунта одним словом"""
+    if result.get('quarantined'):
+        return 'quarantined'
+    if result.get('unauthorized'):
+        return 'unauthorized'
+    if result.get('skipped'):
+        return 'skipped'
+    return 'done' if result.get('success') else 'failed'
+
+
+# Числовые поля записи: нечисловые значения отбрасываются при чтении
+NUMERIC_FIELDS = ('n', 'cycle', 'dur', 'done', 'skip', 'fail', 'defer', 'credits', 'rank')
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _clean_record(record: Any) -> Optional[Dict[str, Any]]:
+    """Проверить типы полей записи (None если запись непригодна для отчета)"""
+    if not isinstance(record, dict) or not _is_number(record.get('ts')):
+        return None
+    try:
+        _day(record['ts'])
+    except (OverflowError, OSError, ValueError):
+        return None
+    for field in NUMERIC_FIELDS:
+        if field in record and not _is_number(record[field]):
+            del record[field]
+    for field in ('account', 'status'):
+        if field in record and not isinstance(record[field], str):
+            record[field] = str(record[field])
+    return record
+
+
+def _day(ts: float) -> str:
+    return datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).strftime("%Y-%m-%d")
+
+
+class RunJournal:
+    """Журнал результатов аккаунтов: одна компактная JSON-строка на аккаунт за цикл.
+
+    Файл ротируется по размеру (runs.jsonl -> runs.jsonl.1 -> ...), отчет читает
+    файлы потоково от старых к новым, не загружая историю в память.
+    """
+
+    def __init__(self, path: str = "data/journal/runs.jsonl", max_bytes: int = 5 * 1024 * 1024, backup_count: int = 10):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = max(0, backup_count)
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["RunJournal"]:
+        """Создать журнал из секции journal конфигурации (None если отключен)"""
+        settings = config.get('journal', {})
+        if not settings.get('enabled', True):
+            return None
+        return cls(
+            path=settings.get('path', 'data/journal/runs.jsonl'),
+            max_bytes=settings.get('max_bytes', 5 * 1024 * 1024),
+            backup_count=settings.get('backup_count', 10)
+        )
+
+    @staticmethod
+    def build_record(token: str, index: int, result: Dict[str, Any], cycle_started: float) -> Dict[str, Any]:
+        """Запись журнала по результату process_account (токен хранится только как хэш)"""
+        task_results = result.get('task_results') or {}
+        stats = result.get('stats') or {}
+        record = {
+            'ts': round(time.time(), 3),
+            'cycle': int(cycle_started),
+            'account': account_key(token)[:12],
+            'n': index + 1,
+            'user': result.get('username'),
+            'status': _status(result),
+            'dur': round(result['duration'], 3) if 'duration' in result else None,
+            'done': task_results.get('completed', 0),
+            'skip': task_results.get('skipped', 0),
+            'fail': task_results.get('failed', 0),
+            'defer': task_results.get('deferred', 0),
+            'credits': stats.get('total_credits'),
+            'rank': stats.get('leaderboard_rank'),
+            'error': result.get('error'),
+        }
+        return {key: value for key, value in record.items() if value is not None}
+
+    def _rotate(self):
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        if self.backup_count:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def append_cycle(self, tokens: List[str], results: List[Dict[str, Any]], cycle_started: float):
+        """Дописать результаты аккаунтов цикла одним блоком"""
+        lines = [
+            json.dumps(self.build_record(token, i, result, cycle_started), ensure_ascii=False, separators=(',', ':'))
+            for i, (token, result) in enumerate(zip(tokens, results))
+        ]
+        if not lines:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            self._rotate()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+    def files(self) -> List[str]:
+        """Файлы журнала от самого старого к текущему"""
+        rotated = [f"{self.path}.{i}" for i in range(self.backup_count, 0, -1)]
+        return [path for path in rotated + [self.path] if os.path.exists(path)]
+
+    def iter_records(self, since: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Потоково читать записи журнала (битые строки и записи с некорректными полями пропускаются)"""
+        for path in self.files():
+            with open(path, 'rb') as f:
+                for line in f:
+                    try:
+                        record = _clean_record(json_loads(line))
+                    except ValueError:
+                        continue
+                    if record is None:
+                        continue
+                    if since is None or record['ts'] >= since:
+                        yield record
+
+
+def aggregate(records: Iterator[Dict[str, Any]]) -> Dict[str, Any]:
+    """Свести поток записей в тренды по дням и аккаунтам (память - по числу дней и аккаунтов)"""
+    days: Dict[str, Dict[str, Any]] = {}
+    accounts: Dict[str, Dict[str, Any]] = {}
+
+    for record in records:
+        day = _day(record['ts'])
+        status = record.get('status')
+        entry = days.setdefault(day, {
+            'runs': 0, 'done': 0, 'skipped': 0, 'failed': 0,
+            'tasks': 0, 'task_failures': 0, 'duration': 0.0, 'timed': 0, 'credits': {}
+        })
+        entry['runs'] += 1
+        if status == 'done':
+            entry['done'] += 1
+        elif status == 'skipped':
+            entry['skipped'] += 1
+        else:
+            entry['failed'] += 1
+        entry['tasks'] += record.get('done', 0)
+        entry['task_failures'] += record.get('fail', 0)
+        if 'dur' in record and status != 'skipped':
+            entry['duration'] += record['dur']
+            entry['timed'] += 1
+
+        key = record.get('account', '?')
+        credits = record.get('credits')
+        if isinstance(credits, (int, float)):
+            # Последнее значение кредитов аккаунта за день
+            entry['credits'][key] = credits
+
+        account = accounts.setdefault(key, {
+            'user': None, 'runs': 0, 'failed': 0, 'first_credits': None, 'last_credits': None,
+            'rank': None, 'last_error': None
+        })
+        account['runs'] += 1
+        account['user'] = record.get('user') or account['user']
+        if status not in ('done', 'skipped'):
+            account['failed'] += 1
+            account['last_error'] = record.get('error') or status
+        if isinstance(credits, (int, float)):
+            if account['first_credits'] is None:
+                account['first_credits'] = credits
+            account['last_credits'] = credits
+        if record.get('rank') is not None:
+            account['rank'] = record['rank']
+
+    return {'days': days, 'accounts': accounts}
+
+
+def format_report(summary: Dict[str, Any], show_accounts: bool = True) -> List[str]:
+    """Текстовые таблицы отчета"""
+    days = summary['days']
+    if not days:
+        return ["Journal is empty"]
+
+    lines = [
+        f"{'Day':<10}  {'runs':>5}  {'done':>5}  {'skip':>5}  {'fail':>5}  "
+        f"{'tasks':>6}  {'task err':>8}  {'avg s':>6}  {'credits':>12}"
+    ]
+    for day in sorted(days):
+        entry = days[day]
+        avg = entry['duration'] / entry['timed'] if entry['timed'] else 0.0
+        credits = sum(entry['credits'].values())
+        lines.append(
+            f"{day:<10}  {entry['runs']:>5}  {entry['done']:>5}  {entry['skipped']:>5}  {entry['failed']:>5}  "
+            f"{entry['tasks']:>6}  {entry['task_failures']:>8}  {avg:>6.1f}  {credits:>12,.0f}"
+        )
+
+    if show_accounts and summary['accounts']:
+        lines.append("")
+        lines.append(f"{'Account':<12}  {'User':<20}  {'runs':>5}  {'fail':>5}  {'credits':>12}  {'change':>10}  {'rank':>8}  Last error")
+        for key, account in sorted(summary['accounts'].items(), key=lambda item: item[1]['failed'], reverse=True):
+            last = account['last_credits']
+            change = last - account['first_credits'] if last is not None else None
+            lines.append(
+                f"{key:<12}  {str(account['user'] or '-')[:20]:<20}  {account['runs']:>5}  {account['failed']:>5}  "
+                f"{(f'{last:,.0f}' if last is not None else '-'):>12}  "
+                f"{(f'{change:+,.0f}' if change is not None else '-'):>10}  "
+                f"{str(account['rank'] if account['rank'] is not None else '-'):>8}  "
+                f"{account['last_error'] or ''}".rstrip()
+            )
+    return lines
@@ -0,0 +1,189 @@
+import math
+import os
+from typing import Dict, Any, Optional, List, Tuple
+from urllib.parse import urlparse
+
+# Границы бакетов гистограмм, секунды
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP = {
+    'cryptal_http_request_duration_seconds': ('histogram', 'HTTP request attempt latency by endpoint'),
+    'cryptal_http_responses_total': ('counter', 'HTTP responses by endpoint and status'),
+    'cryptal_http_retries_total': ('counter', 'HTTP request retries by endpoint'),
+    'cryptal_http_received_bytes_total': ('counter', 'Response body bytes received by endpoint'),
+    'cryptal_http_connections_total': ('counter', 'HTTP connections by kind (new handshakes vs keep-alive reuse)'),
+    'cryptal_dns_lookups_total': ('counter', 'DNS lookups by result (resolved vs cache hit)'),
+    'cryptal_account_duration_seconds': ('histogram', 'Account processing duration'),
+    'cryptal_task_duration_seconds': ('histogram', 'Task completion duration by category'),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def endpoint_label(url: str) -> str:
+    """Метка эндпоинта: хост и путь без query-параметров"""
+    parsed = urlparse(url)
+    return f"{parsed.netloc}{parsed.path or '/'}"
+
+
+def _labels(labels: Optional[Dict[str, Any]]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in (labels or {}).items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ''
+    escaped = [
+        f'{key}="' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for key, value in items
+    ]
+    return '{' + ','.join(escaped) + '}'
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Перцентиль методом ближайшего ранга"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Histogram:
+    """Гистограмма Prometheus с сохранением значений текущего цикла для сводки"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self.cycle_values: List[float] = []
+
+    def observe(self, value: float):
+        self.sum += value
+        self.count += 1
+        self.cycle_values.append(value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class MetricsRegistry:
+    """Реестр метрик: счетчики и гистограммы с экспортом в формат Prometheus"""
+
+    def __init__(self):
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.cycle_counters: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+
+    def inc(self, name: str, labels: Optional[Dict[str, Any]] = None, value: float = 1):
+        """Увеличить счетчик"""
+        key = (name, _labels(labels))
+        self.counters[key] = self.counters.get(key, 0) + value
+        self.cycle_counters[key] = self.cycle_counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None):
+        """Добавить наблюдение в гистограмму"""
+        key = (name, _labels(labels))
+        if key not in self.histograms:
+            self.histograms[key] = Histogram()
+        self.histograms[key].observe(value)
+
+    def start_cycle(self):
+        """Сбросить значения текущего цикла (накопленные метрики сохраняются)"""
+        self.cycle_counters.clear()
+        for histogram in self.histograms.values():
+            histogram.cycle_values = []
+
+    def render_prometheus(self) -> str:
+        """Сформировать текст в формате Prometheus exposition"""
+        lines = []
+        names = sorted({name for name, _ in self.counters} | {name for name, _ in self.histograms})
+        for name in names:
+            kind, description = HELP.get(name, ('untyped', name))
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (metric, labels), value in sorted(self.counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {value:g}")
+            for (metric, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                if metric != name:
+                    continue
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', f'{bound:g}'))} {count}")
+                lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {histogram.count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:.6f}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """Атомарно записать метрики в текстовый файл (для node_exporter textfile collector)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+    def cycle_summary(self) -> List[Dict[str, Any]]:
+        """Строки сводки цикла по эндпоинтам, отсортированные по суммарному времени"""
+        rows = []
+        for (name, labels), histogram in self.histograms.items():
+            if name != 'cryptal_http_request_duration_seconds' or not histogram.cycle_values:
+                continue
+            endpoint = dict(labels).get('endpoint', '')
+            errors = sum(
+                value for (metric, counter_labels), value in self.cycle_counters.items()
+                if metric == 'cryptal_http_responses_total'
+                and dict(counter_labels).get('endpoint') == endpoint
+                and not dict(counter_labels).get('status', '').startswith(('2', '3'))
+            )
+            rows.append({
+                'endpoint': endpoint,
+                'requests': len(histogram.cycle_values),
+                'retries': self.cycle_counters.get(('cryptal_http_retries_total', labels), 0),
+                'errors': errors,
+                'p50': percentile(histogram.cycle_values, 50),
+                'p95': percentile(histogram.cycle_values, 95),
+                'total': sum(histogram.cycle_values),
+                'bytes': self.cycle_counters.get(('cryptal_http_received_bytes_total', labels), 0),
+            })
+        return sorted(rows, key=lambda row: row['total'], reverse=True)
+
+    def format_cycle_summary(self) -> List[str]:
+        """Текстовая таблица сводки цикла"""
+        rows = self.cycle_summary()
+        if not rows:
+            return []
+        width = max(len(row['endpoint']) for row in rows)
+        lines = [
+            f"{'Endpoint'.ljust(width)}  {'reqs':>5}  {'retry':>5}  {'err':>4}  "
+            f"{'p50 ms':>8}  {'p95 ms':>8}  {'total s':>8}  {'KB':>8}"
+        ]
+        for row in rows:
+            lines.append(
+                f"{row['endpoint'].ljust(width)}  {row['requests']:>5}  {row['retries']:>5g}  {row['errors']:>4g}  "
+                f"{row['p50'] * 1000:>8.1f}  {row['p95'] * 1000:>8.1f}  {row['total']:>8.2f}  {row['bytes'] / 1024:>8.1f}"
+            )
+        return lines
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 9108):
+        """Запустить локальный HTTP эндпоинт /metrics"""
+        from aiohttp import web
+
+        async def handle(request):
+            return web.Response(text=self.render_prometheus(), content_type='text/plain', charset='utf-8')
+
+        app = web.Application()
+        app.router.add_get('/metrics', handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        return runner
+
+
+# Общий реестр метрик процесса
+metrics = MetricsRegistry()
@@ -0,0 +1,161 @@
+import json
+from typing import Dict, Any, Optional, List
+
+# Категории каталога, которые бот не выполняет (приглашения и репосты)
+EXCLUDED_CATEGORIES = frozenset({'invite_friend', 'share_post'})
+
+_fast_loads = None
+
+
+class ResponseFormatError(Exception):
+    """Ответ API не соответствует ожидаемому формату"""
+
+
+def json_loads(body: bytes, fast: bool = True) -> Any:
+    """Декодировать JSON через orjson, если он установлен, иначе через стандартный json"""
+    global _fast_loads
+    if fast:
+        if _fast_loads is None:
+            try:
+                import orjson
+                _fast_loads = orjson.loads
+            except ImportError:
+                _fast_loads = False
+        if _fast_loads:
+            return _fast_loads(body)
+    return json.loads(body)
+
+
+def _envelope(payload: Any, endpoint: str) -> Any:
+    """Содержимое конверта {"response": ...} ответа Cryptal API"""
+    if not isinstance(payload, dict) or 'response' not in payload:
+        raise ResponseFormatError(f"{endpoint}: missing 'response' envelope")
+    return payload['response']
+
+
+class Task:
+    """Задача аккаунта: описание из каталога и статус выполнения"""
+
+    __slots__ = ('id', 'name', 'description', 'category', 'credits_reward', 'is_daily', 'is_one_time', 'status')
+
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        description: str,
+        category: str,
+        credits_reward: int = 0,
+        is_daily: bool = False,
+        is_one_time: bool = False,
+        status: str = 'pending'
+    ):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.category = category
+        self.credits_reward = credits_reward
+        self.is_daily = is_daily
+        self.is_one_time = is_one_time
+        self.status = status
+
+    def with_status(self, status: str) -> "Task":
+        """Копия задачи каталога с собственным статусом аккаунта"""
+        return Task(
+            self.id, self.name, self.description, self.category,
+            self.credits_reward, self.is_daily, self.is_one_time, status
+        )
+
+    def __repr__(self) -> str:
+        return f"Task(id={self.id!r}, category={self.category!r}, status={self.status!r})"
+
+
+class UserInfo:
+    """Имя пользователя; fallback - имя построено из токена, а не получено от API"""
+
+    __slots__ = ('username', 'fallback')
+
+    def __init__(self, username: str, fallback: bool = False):
+        self.username = username
+        self.fallback = fallback
+
+    def __repr__(self) -> str:
+        return f"UserInfo(username={self.username!r}, fallback={self.fallback})"
+
+
+class Stats:
+    """Статистика аккаунта: кредиты и место в рейтинге"""
+
+    __slots__ = ('total_credits', 'leaderboard_rank')
+
+    def __init__(self, total_credits: Optional[float] = None, leaderboard_rank: Optional[int] = None):
+        self.total_credits = total_credits
+        self.leaderboard_rank = leaderboard_rank
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'total_credits': self.total_credits, 'leaderboard_rank': self.leaderboard_rank}
+
+    def __repr__(self) -> str:
+        return f"Stats(total_credits={self.total_credits!r}, leaderboard_rank={self.leaderboard_rank!r})"
+
+
+def parse_page(payload: Any, endpoint: str = "page") -> List[Any]:
+    """Элементы страницы списка: {"response": {"data": [...]}}"""
+    body = _envelope(payload, endpoint)
+    items = body.get('data') if isinstance(body, dict) else None
+    if not isinstance(items, list):
+        raise ResponseFormatError(f"{endpoint}: 'data' is not a list")
+    return items
+
+
+def parse_page_total(payload: Any) -> Optional[int]:
+    """Общее число элементов списка из конверта страницы (None если сервер его не передал)"""
+    body = payload.get('response') if isinstance(payload, dict) else None
+    total = body.get('total') if isinstance(body, dict) else None
+    return total if isinstance(total, int) and not isinstance(total, bool) else None
+
+
+def parse_task(item: Any) -> Task:
+    """Задача каталога /vibe-credit/tasks"""
+    if not isinstance(item, dict) or item.get('id') is None or not item.get('task_type'):
+        raise ResponseFormatError("tasks: item without id or task_type")
+    return Task(
+        id=item['id'],
+        name=item.get('task_name') or 'Unknown Task',
+        description=item.get('task_description') or item.get('task_name') or 'Unknown Task',
+        category=item['task_type'],
+        credits_reward=item.get('credits_reward') or 0,
+        is_daily=bool(item.get('is_daily', False)),
+        is_one_time=bool(item.get('is_one_time', False))
+    )
+
+
+def parse_available_id(item: Any) -> Any:
+    """Идентификатор задачи из /vibe-credit/tasks/user-available"""
+    if not isinstance(item, dict) or item.get('id') is None:
+        raise ResponseFormatError("user-available: item without id")
+    return item['id']
+
+
+def parse_user_info(payload: Any) -> Optional[UserInfo]:
+    """Имя пользователя из /auth/social-profiles (None если профилей нет)"""
+    profiles = _envelope(payload, "social-profiles")
+    if not isinstance(profiles, list):
+        raise ResponseFormatError("social-profiles: 'response' is not a list")
+    if not profiles or not isinstance(profiles[0], dict) or not profiles[0].get('display_name'):
+        return None
+    return UserInfo(profiles[0]['display_name'])
+
+
+def parse_stats(payload: Any) -> Stats:
+    """Статистика из /vibe-credit"""
+    data = _envelope(payload, "vibe-credit")
+    if not isinstance(data, dict):
+        raise ResponseFormatError("vibe-credit: 'response' is not an object")
+    return Stats(data.get('total_credits'), data.get('leaderboard_rank'))
+
+
+def parse_ip(payload: Any) -> str:
+    """Публичный IP из ответа сервиса {"ip": ...}"""
+    if not isinstance(payload, dict) or not payload.get('ip'):
+        raise ResponseFormatError("ip: missing 'ip' field")
+    return str(payload['ip'])
@@ -0,0 +1,151 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Mapping
+from urllib.parse import urlparse
+from ..utils.logger import Logger
+
+# Ожидание разрешения дольше этого значения (секунды) попадает в лог
+LONG_WAIT = 10.0
+
+# Статусы, при которых повторная попытка имеет смысл
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def is_retryable_status(status: int) -> bool:
+    """Проверить, стоит ли повторять запрос с данным HTTP статусом"""
+    return status in RETRYABLE_STATUSES or 500 <= status < 600
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Разобрать заголовок Retry-After (секунды или HTTP-дата) в секунды ожидания"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def parse_rate_limit_reset(value: Optional[str]) -> Optional[float]:
+    """Разобрать X-RateLimit-Reset: секунды до сброса или unix-время сброса"""
+    if not value:
+        return None
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    # Значения больше ~30 лет в секундах считаем абсолютным unix-временем
+    if reset > 1e9:
+        reset -= time.time()
+    return max(0.0, reset)
+
+
+def backoff_delay(attempt: int, base: float, factor: float, max_backoff: float) -> float:
+    """Экспоненциальная задержка с джиттером: base * factor^attempt, в пределах [50%, 100%]"""
+    wait = min(max_backoff, base * (factor ** attempt))
+    return wait * random.uniform(0.5, 1.0)
+
+
+class TokenBucket:
+    """Token bucket для одного хоста"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def reserve(self) -> float:
+        """Зарезервировать токен и вернуть время ожидания до его появления"""
+        now = time.monotonic()
+        wait = max(0.0, self.blocked_until - now)
+
+        if self.rate <= 0:
+            return wait
+
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens < 0:
+            wait = max(wait, -self.tokens / self.rate)
+        return wait
+
+    def block(self, seconds: float):
+        """Заблокировать хост на заданное время"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """Ограничитель частоты запросов по хостам с учетом Retry-After и X-RateLimit-*"""
+
+    def __init__(self, rate: float = 5.0, burst: float = 10.0, max_block: float = 120.0):
+        self.rate = rate
+        self.burst = burst
+        # Блокировка хоста по заголовкам сервера не длиннее api.max_retry_after
+        self.max_block = max_block
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    @classmethod
+    def from_config(cls, config: dict) -> "RateLimiter":
+        """Создать ограничитель из секции api.rate_limit конфигурации"""
+        api_config = config.get('api', {})
+        settings = api_config.get('rate_limit', {})
+        return cls(
+            rate=settings.get('requests_per_second', 5.0),
+            burst=settings.get('burst', 10.0),
+            max_block=api_config.get('max_retry_after', 120)
+        )
+
+    def configure(self, rate: float, burst: float, max_block: Optional[float] = None):
+        """Изменить частоту и burst, сохранив блокировки хостов (Retry-After, X-RateLimit-*)"""
+        self.rate = rate
+        self.burst = burst
+        if max_block is not None:
+            self.max_block = max_block
+        for bucket in self.buckets.values():
+            bucket.rate = rate
+            bucket.capacity = max(1.0, burst)
+            bucket.tokens = min(bucket.tokens, bucket.capacity)
+
+    def bucket(self, url: str) -> TokenBucket:
+        """Получить bucket для хоста URL"""
+        host = urlparse(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.burst)
+        return self.buckets[host]
+
+    async def acquire(self, url: str):
+        """Дождаться разрешения на запрос к хосту"""
+        wait = self.bucket(url).reserve()
+        if wait > 0:
+            if wait >= LONG_WAIT:
+                Logger.warn(f"Host {urlparse(url).netloc} is rate limited, waiting {wait:.0f}s", emoji="⏳")
+            await asyncio.sleep(wait)
+
+    def block(self, url: str, seconds: float):
+        """Приостановить запросы к хосту (не дольше max_block)"""
+        seconds = min(seconds, self.max_block)
+        if seconds > 0:
+            self.bucket(url).block(seconds)
+
+    def update(self, url: str, headers: Mapping[str, str]):
+        """Учесть заголовки X-RateLimit-* ответа"""
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is None:
+            return
+        try:
+            exhausted = float(remaining) <= 0
+        except ValueError:
+            return
+        if exhausted:
+            reset = parse_rate_limit_reset(headers.get('X-RateLimit-Reset'))
+            if reset:
+                self.block(url, reset)
@@ -0,0 +1,95 @@
+import datetime
+import json
+import math
+import os
+import time
+from typing import Optional
+from ..utils.logger import Logger
+
+
+class DailyScheduler:
+    """Планировщик циклов, привязанный к времени суток (без дрейфа на длительность цикла).
+
+    Слоты идут с шагом interval от якоря run_at (UTC). В каждом слоте выполняется
+    не более одного цикла; пропущенные во время простоя слоты догоняются одним циклом.
+    Время последнего выполненного слота хранится в файле и переживает перезапуск.
+    """
+
+    def __init__(
+        self,
+        run_at_utc: str = "00:05",
+        interval: float = 86400,
+        state_file: Optional[str] = "data/schedule.json"
+    ):
+        hours, minutes = (int(part) for part in run_at_utc.split(':', 1))
+        self.anchor = (hours * 3600 + minutes * 60) % 86400
+        self.interval = max(60.0, float(interval))
+        self.state_file = state_file
+        # Максимальный интервал сна: ожидание идет короткими шагами по часам реального времени
+        self.max_sleep = 300
+        self.last_run_slot: Optional[float] = None
+        self.next_run: Optional[float] = None
+        self._load()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "DailyScheduler":
+        """Создать планировщик из секций schedule, state и delays конфигурации"""
+        settings = config.get('schedule', {})
+        run_at = settings.get('run_at_utc')
+        if not run_at:
+            # По умолчанию - сразу после ежедневного сброса сервиса
+            reset_hour = config.get('state', {}).get('reset_hour_utc', 0)
+            margin = settings.get('reset_margin_minutes', 5)
+            run_at = f"{reset_hour + margin // 60:02d}:{margin % 60:02d}"
+        return cls(
+            run_at_utc=run_at,
+            interval=config.get('delays', {}).get('cycle_delay', 86400),
+            state_file=settings.get('state_file', 'data/schedule.json')
+        )
+
+    def _load(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.last_run_slot = data.get('last_run_slot')
+            self.next_run = data.get('next_run')
+        except (OSError, ValueError) as e:
+            Logger.warn(f"Failed to read schedule state from {self.state_file}: {e}")
+
+    def _save(self):
+        if not self.state_file:
+            return
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.state_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'last_run_slot': self.last_run_slot, 'next_run': self.next_run}, f)
+        os.replace(tmp_path, self.state_file)
+
+    def slot_start(self, now: Optional[float] = None) -> float:
+        """Начало слота, в который попадает момент now"""
+        now = time.time() if now is None else now
+        # Слоты отсчитываются от якоря в первые сутки эпохи, поэтому не зависят от момента запуска
+        return self.anchor + math.floor((now - self.anchor) / self.interval) * self.interval
+
+    def seconds_until_due(self, now: Optional[float] = None) -> float:
+        """Сколько ждать до следующего цикла (0 - цикл текущего слота еще не выполнен)"""
+        now = time.time() if now is None else now
+        current = self.slot_start(now)
+        if self.last_run_slot is None or self.last_run_slot < current:
+            return 0.0
+        return max(0.0, current + self.interval - now)
+
+    def mark_run(self, started_at: float):
+        """Отметить выполнение цикла, начатого в момент started_at, и сохранить расписание"""
+        self.last_run_slot = self.slot_start(started_at)
+        self.next_run = self.last_run_slot + self.interval
+        self._save()
+
+    def next_run_at(self) -> str:
+        """Время следующего цикла в UTC для логов"""
+        moment = time.time() + self.seconds_until_due()
+        return datetime.datetime.fromtimestamp(moment, datetime.timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
@@ -0,0 +1,218 @@
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Any, Optional, Set, Iterable
+from .models import Task, Stats
+
+# Окно для одноразовых задач: выполненные один раз, они не сбрасываются
+ONE_TIME_WINDOW = '*'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    account_key TEXT PRIMARY KEY,
+    username TEXT,
+    stats TEXT,
+    stats_updated REAL
+);
+CREATE TABLE IF NOT EXISTS task_done (
+    account_key TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    window TEXT NOT NULL,
+    done_at REAL NOT NULL,
+    PRIMARY KEY (account_key, task_id, window)
+);
+CREATE TABLE IF NOT EXISTS account_runs (
+    account_key TEXT NOT NULL,
+    window TEXT NOT NULL,
+    completed_at REAL NOT NULL,
+    PRIMARY KEY (account_key, window)
+);
+CREATE TABLE IF NOT EXISTS token_auth (
+    account_key TEXT PRIMARY KEY,
+    failures INTEGER NOT NULL,
+    last_failure REAL NOT NULL,
+    quarantined_until REAL
+);
+"""
+
+
+def account_key(token: str) -> str:
+    """Ключ аккаунта: хэш токена, сам токен в хранилище не попадает"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()[:32]
+
+
+class StateStore:
+    """Персистентное состояние аккаунтов по дневным окнам (SQLite)"""
+
+    def __init__(
+        self,
+        path: str = "data/state.db",
+        reset_hour_utc: int = 0,
+        quarantine_after: int = 3,
+        quarantine_hours: float = 24
+    ):
+        self.path = path
+        self.reset_hour_utc = reset_hour_utc
+        self.quarantine_after = max(1, quarantine_after)
+        self.quarantine_hours = quarantine_hours
+        self.conn: Optional[sqlite3.Connection] = None
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["StateStore"]:
+        """Создать хранилище из секции state конфигурации (None если отключено)"""
+        settings = config.get('state', {})
+        if not settings.get('enabled', True):
+            return None
+        token_settings = config.get('tokens', {})
+        return cls(
+            path=settings.get('path', 'data/state.db'),
+            reset_hour_utc=settings.get('reset_hour_utc', 0),
+            quarantine_after=token_settings.get('quarantine_after', 3),
+            quarantine_hours=token_settings.get('quarantine_hours', 24)
+        )
+
+    def open(self):
+        """Открыть базу и создать таблицы"""
+        if self.conn is not None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        """Закрыть базу"""
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def current_window(self, now: Optional[float] = None) -> str:
+        """Текущее дневное окно (дата UTC со сдвигом на час сброса)"""
+        moment = datetime.datetime.fromtimestamp(time.time() if now is None else now, datetime.timezone.utc)
+        moment -= datetime.timedelta(hours=self.reset_hour_utc)
+        return moment.strftime("%Y-%m-%d")
+
+    def _execute(self, query: str, params: tuple = ()) -> sqlite3.Cursor:
+        self.open()
+        return self.conn.execute(query, params)
+
+    def is_account_done(self, token: str, window: Optional[str] = None) -> bool:
+        """Проверить, завершен ли аккаунт в текущем окне"""
+        row = self._execute(
+            "SELECT 1 FROM account_runs WHERE account_key = ? AND window = ?",
+            (account_key(token), window or self.current_window())
+        ).fetchone()
+        return row is not None
+
+    def mark_account_done(self, token: str, window: Optional[str] = None):
+        """Отметить аккаунт завершенным в текущем окне"""
+        self._execute(
+            "INSERT OR REPLACE INTO account_runs (account_key, window, completed_at) VALUES (?, ?, ?)",
+            (account_key(token), window or self.current_window(), time.time())
+        )
+        self.conn.commit()
+
+    def get_done_tasks(self, token: str, window: Optional[str] = None, include_one_time: bool = True) -> Set[str]:
+        """Задачи, выполненные в текущем окне, и (если include_one_time) одноразовые задачи"""
+        windows = (window or self.current_window(), ONE_TIME_WINDOW if include_one_time else None)
+        rows = self._execute(
+            "SELECT task_id FROM task_done WHERE account_key = ? AND window IN (?, ?)",
+            (account_key(token),) + windows
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def mark_tasks_done(self, token: str, tasks: Iterable[Task], window: Optional[str] = None):
+        """Отметить задачи выполненными (одноразовые - навсегда, остальные - в текущем окне)"""
+        key = account_key(token)
+        window = window or self.current_window()
+        now = time.time()
+        rows = [
+            (key, str(task.id), ONE_TIME_WINDOW if task.is_one_time else window, now)
+            for task in tasks
+        ]
+        if not rows:
+            return
+        self.open()
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO task_done (account_key, task_id, window, done_at) VALUES (?, ?, ?, ?)",
+            rows
+        )
+        self.conn.commit()
+
+    def get_account(self, token: str) -> Dict[str, Any]:
+        """Кэшированные имя пользователя и статистика"""
+        row = self._execute(
+            "SELECT username, stats, stats_updated FROM accounts WHERE account_key = ?",
+            (account_key(token),)
+        ).fetchone()
+        if row is None:
+            return {}
+        return {
+            'username': row[0],
+            'stats': json.loads(row[1]) if row[1] else None,
+            'stats_updated': row[2]
+        }
+
+    def save_username(self, token: str, username: str):
+        """Сохранить имя пользователя"""
+        self._execute(
+            "INSERT INTO accounts (account_key, username) VALUES (?, ?) "
+            "ON CONFLICT(account_key) DO UPDATE SET username = excluded.username",
+            (account_key(token), username)
+        )
+        self.conn.commit()
+
+    def save_stats(self, token: str, stats: Stats):
+        """Сохранить последнюю статистику"""
+        self._execute(
+            "INSERT INTO accounts (account_key, stats, stats_updated) VALUES (?, ?, ?) "
+            "ON CONFLICT(account_key) DO UPDATE SET stats = excluded.stats, stats_updated = excluded.stats_updated",
+            (account_key(token), json.dumps(stats.to_dict()), time.time())
+        )
+        self.conn.commit()
+
+    def is_quarantined(self, token: str, now: Optional[float] = None) -> bool:
+        """Проверить, находится ли токен в карантине после повторных 401"""
+        row = self._execute(
+            "SELECT quarantined_until FROM token_auth WHERE account_key = ?",
+            (account_key(token),)
+        ).fetchone()
+        return bool(row and row[0] and row[0] > (time.time() if now is None else now))
+
+    def record_auth_failure(self, token: str) -> bool:
+        """Учесть ответ 401; вернуть True, если токен отправлен в карантин.
+
+        После истечения карантина токен получает одну пробу: повторный 401 сразу возвращает его в карантин.
+        """
+        now = time.time()
+        key = account_key(token)
+        row = self._execute("SELECT failures FROM token_auth WHERE account_key = ?", (key,)).fetchone()
+        failures = (row[0] if row else 0) + 1
+        quarantined_until = now + self.quarantine_hours * 3600 if failures >= self.quarantine_after else None
+        self._execute(
+            "INSERT OR REPLACE INTO token_auth (account_key, failures, last_failure, quarantined_until) "
+            "VALUES (?, ?, ?, ?)",
+            (key, failures, now, quarantined_until)
+        )
+        self.conn.commit()
+        return quarantined_until is not None
+
+    def clear_auth_failures(self, token: str):
+        """Сбросить счетчик 401 после успешного запроса"""
+        self._execute("DELETE FROM token_auth WHERE account_key = ?", (account_key(token),))
+        self.conn.commit()
+
+    def prune(self, keep_windows: int = 7):
+        """Удалить записи старше заданного числа окон"""
+        cutoff = (
+            datetime.datetime.strptime(self.current_window(), "%Y-%m-%d")
+            - datetime.timedelta(days=keep_windows)
+        ).strftime("%Y-%m-%d")
+        self._execute("DELETE FROM task_done WHERE window != ? AND window < ?", (ONE_TIME_WINDOW, cutoff))
+        self._execute("DELETE FROM account_runs WHERE window < ?", (cutoff,))
+        self.conn.commit()
@@ -0,0 +1,108 @@
+import base64
+import binascii
+import datetime
+import json
+import time
+from typing import Dict, Any, Optional, List, Tuple, Iterable
+from .state_store import account_key
+from ..utils.logger import Logger
+
+VALID = 'valid'
+EXPIRED = 'expired'
+MALFORMED = 'malformed'
+OPAQUE = 'opaque'
+
+
+def decode_jwt_claims(token: str) -> Optional[Dict[str, Any]]:
+    """Декодировать payload JWT без проверки подписи (None если токен не разбирается)"""
+    parts = token.split('.')
+    if len(parts) != 3:
+        return None
+    payload = parts[1]
+    try:
+        raw = base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4))
+        claims = json.loads(raw)
+    except (binascii.Error, ValueError):
+        return None
+    return claims if isinstance(claims, dict) else None
+
+
+def _valid_exp(exp: Any) -> bool:
+    """exp - число секунд, представимое датой (не bool, не NaN/inf и не за пределами календаря)"""
+    if isinstance(exp, bool) or not isinstance(exp, (int, float)):
+        return False
+    try:
+        datetime.datetime.fromtimestamp(exp, datetime.timezone.utc)
+    except (OverflowError, OSError, ValueError):
+        return False
+    return True
+
+
+class TokenValidator:
+    """Локальная проверка JWT-токенов: истекшие и битые токены отсеиваются без сетевых запросов.
+
+    Результат разбора кэшируется по хэшу токена, срок действия сверяется с часами при каждой проверке.
+    Токены не в формате JWT считаются непрозрачными и пропускаются без проверки.
+    """
+
+    def __init__(self, expiry_leeway: float = 60):
+        self.expiry_leeway = expiry_leeway
+        self._cache: Dict[str, Tuple[str, Optional[float]]] = {}
+
+    @classmethod
+    def from_config(cls, config: dict) -> "TokenValidator":
+        """Создать валидатор из секции tokens конфигурации"""
+        settings = config.get('tokens', {})
+        return cls(expiry_leeway=settings.get('expiry_leeway_seconds', 60))
+
+    def _parse(self, token: str) -> Tuple[str, Optional[float]]:
+        key = account_key(token)
+        if key in self._cache:
+            return self._cache[key]
+
+        if token.count('.') != 2:
+            parsed = (OPAQUE, None)
+        else:
+            claims = decode_jwt_claims(token)
+            if claims is None:
+                parsed = (MALFORMED, None)
+            else:
+                exp = claims.get('exp')
+                if exp is None:
+                    parsed = (VALID, None)
+                elif _valid_exp(exp):
+                    parsed = (VALID, float(exp))
+                else:
+                    parsed = (MALFORMED, None)
+
+        self._cache[key] = parsed
+        return parsed
+
+    def forget(self, tokens: Iterable[str]):
+        """Удалить из кэша разбора токены, исчезнувшие из файла"""
+        for token in tokens:
+            self._cache.pop(account_key(token), None)
+
+    def check(self, token: str, now: Optional[float] = None) -> Tuple[str, Optional[float]]:
+        """Статус токена (valid / expired / malformed / opaque) и время истечения"""
+        status, exp = self._parse(token)
+        now = time.time() if now is None else now
+        # Токен, истекающий в ближайшие expiry_leeway секунд, не переживет обработку аккаунта
+        if status == VALID and exp is not None and exp <= now + self.expiry_leeway:
+            return EXPIRED, exp
+        return status, exp
+
+    def filter(self, tokens: List[str]) -> List[str]:
+        """Оставить токены, пригодные для обработки, и залогировать отсеянные"""
+        usable = []
+        for i, token in enumerate(tokens):
+            status, exp = self.check(token)
+            if status == EXPIRED:
+                expired_at = datetime.datetime.fromtimestamp(exp, datetime.timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+                Logger.warn(f"Token #{i + 1} expired at {expired_at}, skipping", emoji="⏳")
+            elif status == MALFORMED:
+                Logger.warn(f"Token #{i + 1} is not a valid JWT, skipping", emoji="⚠️")
+            else:
+                usable.append(token)
+        return usable
+
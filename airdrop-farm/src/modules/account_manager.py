@@ -1,44 +1,82 @@
 import asyncio
+import time
 from typing import Dict, Any, Optional, List
-from ..core.http_client import HttpClient
-from ..modules.task_manager import TaskManager
+from ..core.http_client import HttpClient, SessionPool
+from ..core.rate_limiter import RateLimiter
+from ..core.circuit_breaker import CircuitBreakerRegistry
+from ..core.state_store import StateStore
+from ..core.metrics import metrics
+from ..core.models import UserInfo, Stats, parse_user_info, parse_stats
+from ..modules.task_manager import TaskManager, TaskCatalog
 from ..utils.logger import Logger
-from ..utils.display import print_header, print_info, format_task_table
 from ..utils.helpers import truncate_token, format_number, delay
 
 class AccountManager:
     """Менеджер для работы с аккаунтами"""
     
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, headless: bool = False):
         self.config = config
+        # В headless режиме модули отображения (rich, pyfiglet) не импортируются
+        self.headless = headless
         self.base_url = config.get('api', {}).get('base_url', 'https://api.cryptal.ai')
+        self.task_catalog = TaskCatalog(self.base_url, config.get('api', {}).get('page_size', 100))
+        # Общий для всех аккаунтов лимит запросов по хостам
+        self.rate_limiter = RateLimiter.from_config(config)
+        # Circuit breaker'ы эндпоинтов задач, общие для всех аккаунтов
+        self.circuit_breakers = CircuitBreakerRegistry.from_config(config)
+        # Персистентное состояние аккаунтов (None если отключено в конфигурации)
+        self.state_store = StateStore.from_config(config)
+        # Публичный IP по маршрутам выхода (прокси или прямое соединение) за текущий цикл
+        self.public_ips: Dict[str, Optional[str]] = {}
     
-    async def fetch_user_info(self, token: str, http_client: HttpClient, context: str = "") -> Dict[str, Any]:
+    def apply_config(self, config: dict):
+        """Применить перезагруженную конфигурацию, сохранив кэш каталога, блокировки хостов, circuit'ы и базу состояния"""
+        self.config = config
+        base_url = config.get('api', {}).get('base_url', 'https://api.cryptal.ai')
+        page_size = config.get('api', {}).get('page_size', 100)
+        if base_url != self.base_url or page_size != self.task_catalog.page_size:
+            self.task_catalog = TaskCatalog(base_url, page_size)
+        self.base_url = base_url
+        limits = RateLimiter.from_config(config)
+        self.rate_limiter.configure(limits.rate, limits.burst, limits.max_block)
+        
+        threshold = CircuitBreakerRegistry.from_config(config).failure_threshold
+        self.circuit_breakers.failure_threshold = threshold
+        for breaker in self.circuit_breakers.breakers.values():
+            breaker.failure_threshold = max(1, threshold)
+        
+        # Соединение с той же базой переиспользуется, при смене пути открывается новая
+        state_store = StateStore.from_config(config)
+        if self.state_store is not None:
+            if state_store is not None and state_store.path == self.state_store.path:
+                state_store.conn = self.state_store.conn
+            else:
+                self.state_store.close()
+        self.state_store = state_store
+    
+    async def fetch_user_info(self, token: str, http_client: HttpClient, context: str = "") -> UserInfo:
         """Получить информацию о пользователе"""
+        fallback = UserInfo(f"Token_{truncate_token(token)}", fallback=True)
         try:
             url = f"{self.base_url}/apis/v2/auth/social-profiles"
             response = await http_client.get(url, token=token, context=context)
             
             if not response['success']:
                 Logger.warn('Failed to fetch user info, using token identifier', context=context)
-                return {'username': f"Token_{truncate_token(token)}"}
+                return fallback
             
-            response_data = response.get('response', {})
-            profiles = response_data.get('response', [])
-            
-            if not isinstance(profiles, list) or len(profiles) == 0:
+            user_info = parse_user_info(response['response'])
+            if user_info is None:
                 Logger.warn('No social profiles found, using token identifier', context=context)
-                return {'username': f"Token_{truncate_token(token)}"}
-            
-            username = profiles[0].get('display_name', f"Token_{truncate_token(token)}")
-            return {'username': username}
+                return fallback
+            return user_info
             
         except Exception as e:
             Logger.error(f"Failed to fetch user info: {e}", context=context)
-            return {'username': f"Token_{truncate_token(token)}"}
+            return fallback
     
-    async def fetch_statistics(self, token: str, http_client: HttpClient, context: str = "") -> Dict[str, Any]:
-        """Получить статистику пользователя"""
+    async def fetch_statistics(self, token: str, http_client: HttpClient, context: str = "") -> Optional[Stats]:
+        """Получить статистику пользователя (None при ошибке)"""
         try:
             url = f"{self.base_url}/apis/v2/vibe-credit"
             response = await http_client.get(url, token=token, context=context)
@@ -46,77 +84,166 @@ class AccountManager:
             if not response['success']:
                 raise Exception('Failed to fetch statistics')
             
-            response_data = response.get('response', {})
-            data = response_data.get('response', {})
-            
-            return {
-                'total_credits': format_number(data.get('total_credits', 'N/A')),
-                'leaderboard_rank': format_number(data.get('leaderboard_rank', 'N/A'))
-            }
+            return parse_stats(response['response'])
             
         except Exception as e:
-            Logger.error(f"Failed to fetch statistics: {e}", context=context)
-            return {'error': f'Failed: {e}'}
+            Logger.error(f"Failed to fetch stats: {e}", context=context)
+            return None
+    
+    async def lookup_public_ip(self, http_client: HttpClient, proxy: Optional[str], context: str = "") -> Optional[str]:
+        """Публичный IP: только при api.ip_lookup, один запрос на маршрут выхода за цикл"""
+        if not self.config.get('api', {}).get('ip_lookup', False):
+            return None
+        route = proxy or 'direct'
+        if route not in self.public_ips:
+            # Неудачный запрос тоже кэшируется: до конца цикла маршрут не опрашивается
+            self.public_ips[route] = await http_client.get_public_ip(context)
+        return self.public_ips[route]
+    
+    def _unauthorized_result(self, token: str, context: str) -> Dict[str, Any]:
+        """Результат аккаунта, токен которого отклонен сервером (401)"""
+        if self.state_store and self.state_store.record_auth_failure(token):
+            Logger.error("Token rejected with 401, quarantined", emoji="🚫", context=context)
+        else:
+            Logger.error("Token rejected with 401", context=context)
+        return {'success': False, 'unauthorized': True, 'error': 'Unauthorized'}
     
     async def process_account(
         self,
         token: str,
         index: int,
         total: int,
-        proxy: Optional[str] = None
+        proxy: Optional[str] = None,
+        session_pool: Optional[SessionPool] = None
     ) -> Dict[str, Any]:
         """Обработать один аккаунт"""
         context = f"Account {index + 1}/{total}"
         
         Logger.info("Starting account processing", emoji="🚀", context=context)
+        started = time.perf_counter()
+        
+        if not self.headless:
+            from ..utils.display import print_header, print_info, format_task_table
+        
+        state = self.state_store
+        cached = state.get_account(token) if state else {}
+        
+        # Токен в карантине после повторных 401 - не тратим на него запросы
+        if state and state.is_quarantined(token):
+            Logger.warn("Token quarantined after repeated 401 responses, skipping", emoji="🚫", context=context)
+            return {'success': False, 'skipped': True, 'quarantined': True, 'error': 'Token quarantined'}
+        
+        # Аккаунт уже завершен в текущем дневном окне - запросы не нужны
+        if state and state.is_account_done(token):
+            Logger.info("Already completed in current daily window, skipping", emoji="⏭️", context=context)
+            return {
+                'success': True,
+                'skipped': True,
+                'username': cached.get('username') or f"Token_{truncate_token(token)}",
+                'task_results': {'completed': 0, 'skipped': 0, 'failed': 0, 'deferred': 0},
+                'stats': cached.get('stats') or {}
+            }
         
         try:
-            # Создаем HTTP клиент
-            async with HttpClient(self.config, proxy) as http_client:
+            # Создаем HTTP клиент (общая сессия только для аккаунтов, которые действительно обрабатываются)
+            session = await session_pool.session_for(proxy) if session_pool else None
+            async with HttpClient(self.config, proxy, self.rate_limiter, session) as http_client:
                 
                 # Получаем информацию об аккаунте
-                print_header(f"Account Info {context}")
+                if not self.headless:
+                    print_header(f"Account Info {context}")
+                
+                if cached.get('username'):
+                    user_info = UserInfo(cached['username'])
+                else:
+                    user_info = await self.fetch_user_info(token, http_client, context)
+                    if state and not user_info.fallback:
+                        state.save_username(token, user_info.username)
                 
-                user_info = await self.fetch_user_info(token, http_client, context)
-                ip = await http_client.get_public_ip(context)
+                if http_client.unauthorized:
+                    return self._unauthorized_result(token, context)
                 
-                print_info('Username', user_info['username'], context)
-                print_info('IP', ip, context)
-                print()
+                ip = await self.lookup_public_ip(http_client, proxy, context)
+                
+                if not self.headless:
+                    print_info('Username', user_info.username, context)
+                    if ip:
+                        print_info('IP', ip, context)
+                    Logger.raw()
                 
                 # Создаем менеджер задач
-                task_manager = TaskManager(self.config, http_client)
+                task_manager = TaskManager(
+                    self.config, http_client, self.task_catalog, self.circuit_breakers, self.headless, state
+                )
                 
                 # Получаем и обрабатываем задачи
                 tasks = await task_manager.fetch_tasks(token, context)
                 
+                if http_client.unauthorized:
+                    return self._unauthorized_result(token, context)
+                
                 if not tasks:
                     Logger.error("Failed to fetch tasks", context=context)
                     return {'success': False, 'error': 'Failed to fetch tasks'}
                 
-                # Обрабатываем задачи
+                # Задачи, выполненные ранее в этом окне (например, до падения), не повторяем.
+                # Бессрочные записи одноразовых задач не перекрывают свежий список user-available
+                if state:
+                    done_task_ids = state.get_done_tasks(token, include_one_time=False)
+                    for task in tasks:
+                        if str(task.id) in done_task_ids:
+                            task.status = 'completed'
+                    state.mark_tasks_done(token, [task for task in tasks if task.status == 'completed'])
+                
+                # Обрабатываем задачи (каждая выполненная задача сохраняется сразу)
                 task_results = await task_manager.process_tasks(token, tasks, context)
                 
+                # Токен отозван во время выполнения задач
+                if http_client.unauthorized:
+                    result = self._unauthorized_result(token, context)
+                    result.update({'username': user_info.username, 'task_results': task_results})
+                    return result
+                
+                if state:
+                    state.clear_auth_failures(token)
+                
                 # Показываем таблицу задач
-                format_task_table(tasks, context)
+                if not self.headless:
+                    format_task_table(tasks, context)
+                    print_header(f"Account Stats {context}")
                 
                 # Получаем статистику
-                print_header(f"Account Stats {context}")
                 stats = await self.fetch_statistics(token, http_client, context)
                 
-                if 'error' in stats:
-                    Logger.error(f"Failed to fetch stats: {stats['error']}", context=context)
-                else:
-                    print_info('Total Credits', stats['total_credits'], context)
-                    print_info('Leaderboard Rank', stats['leaderboard_rank'], context)
+                if stats is not None:
+                    if not self.headless:
+                        print_info('Total Credits', format_number(stats.total_credits), context)
+                        print_info('Leaderboard Rank', format_number(stats.leaderboard_rank), context)
+                    if state:
+                        state.save_stats(token, stats)
                 
-                Logger.success("Completed account processing", emoji="🎉", context=context)
+                # Аккаунт завершен в окне, если ничего не упало и не было отложено
+                if state and task_results['failed'] == 0 and task_results.get('deferred', 0) == 0:
+                    state.mark_account_done(token)
+                
+                if self.headless:
+                    Logger.success(
+                        f"{user_info.username} | {f'IP {ip} | ' if ip else ''}"
+                        f"tasks {task_results['completed']} done, {task_results['skipped']} skipped, "
+                        f"{task_results['failed']} failed | "
+                        f"credits {format_number(stats.total_credits) if stats else 'N/A'} | "
+                        f"rank {format_number(stats.leaderboard_rank) if stats else 'N/A'} | "
+                        f"{time.perf_counter() - started:.1f}s",
+                        emoji="🎉", context=context
+                    )
+                else:
+                    Logger.success("Completed account processing", emoji="🎉", context=context)
                 
                 return {
                     'success': True,
-                    'username': user_info['username'],
+                    'username': user_info.username,
                     'task_results': task_results,
-                    'stats': stats
+                    'stats': stats.to_dict() if stats else {}
                 }
                 
         except Exception as e:
@@ -126,7 +253,8 @@ class AccountManager:
     async def process_multiple_accounts(
         self,
         tokens: List[str],
-        proxies: List[str] = None
+        proxies: List[str] = None,
+        session_pool: Optional[SessionPool] = None
     ) -> List[Dict[str, Any]]:
         """Обработать несколько аккаунтов"""
         results = []
@@ -135,18 +263,32 @@ class AccountManager:
             Logger.error("No tokens provided", emoji="❌")
             return results
         
+        # Каталог задач загружается один раз за цикл и ревалидируется между циклами
+        self.task_catalog.start_cycle()
+        self.circuit_breakers.start_cycle()
+        self.public_ips.clear()
+        
+        if self.state_store:
+            self.state_store.prune()
+        
         for i, token in enumerate(tokens):
             proxy = None
             if proxies and len(proxies) > 0:
                 proxy = proxies[i % len(proxies)]
             
             try:
-                result = await self.process_account(token, i, len(tokens), proxy)
+                account_started = time.perf_counter()
+                # Номер аккаунта попадает в JSON-лог отдельным полем во всех записях аккаунта
+                with Logger.bind(account=i + 1):
+                    result = await self.process_account(token, i, len(tokens), proxy, session_pool)
+                result['duration'] = time.perf_counter() - account_started
+                metrics.observe('cryptal_account_duration_seconds', result['duration'], {'account': i + 1})
                 results.append(result)
                 
                 # Задержка между аккаунтами
                 if i < len(tokens) - 1:
-                    print("\n\n")
+                    if not self.headless:
+                        Logger.raw("\n\n")
                     delay_time = self.config.get('delays', {}).get('between_accounts', 5)
                     await delay(delay_time)
                     
@@ -1,188 +1,259 @@
 import asyncio
+import contextlib
+import time
 from typing import List, Dict, Any, Optional
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
 from ..core.http_client import HttpClient
+from ..core.circuit_breaker import CircuitBreakerRegistry
+from ..core.metrics import metrics
+from ..core.state_store import StateStore
+from ..core.models import Task, EXCLUDED_CATEGORIES, parse_task, parse_available_id
 from ..utils.logger import Logger
 from ..utils.helpers import get_random_email, get_random_feedback, delay
 
+class TaskCatalog:
+    """Общий для всех аккаунтов каталог задач с условной ревалидацией страниц (ETag / Last-Modified)"""
+    
+    def __init__(self, base_url: str, page_size: int = 100):
+        self.url = f"{base_url}/apis/v2/vibe-credit/tasks"
+        self.page_size = page_size
+        self.tasks: Optional[List[Task]] = None
+        self.pages: Dict[int, Dict[str, Any]] = {}
+        self.fresh = False
+        self._lock: Optional[asyncio.Lock] = None
+    
+    def start_cycle(self):
+        """Пометить каталог для ревалидации в новом цикле"""
+        self.fresh = False
+    
+    async def get(self, token: str, http_client: HttpClient, context: str = "") -> List[Task]:
+        """Получить каталог: один обход страниц за цикл, неизмененные страницы отвечают 304"""
+        if self.fresh:
+            return self.tasks
+        
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        
+        async with self._lock:
+            if self.fresh:
+                return self.tasks
+            
+            tasks = [
+                task async for task in http_client.paginate(
+                    self.url, token=token, context=context, page_size=self.page_size,
+                    cache=self.pages, parse=parse_task
+                )
+            ]
+            if not tasks:
+                raise Exception('Invalid task list response format')
+            
+            self.tasks = tasks
+            self.fresh = True
+            return self.tasks
+
+
 class TaskManager:
     """Менеджер для работы с задачами"""
     
-    def __init__(self, config: dict, http_client: HttpClient):
+    def __init__(
+        self,
+        config: dict,
+        http_client: HttpClient,
+        catalog: Optional[TaskCatalog] = None,
+        breakers: Optional[CircuitBreakerRegistry] = None,
+        headless: bool = False,
+        state_store: Optional[StateStore] = None
+    ):
         self.config = config
         self.http_client = http_client
         self.base_url = config.get('api', {}).get('base_url', 'https://api.cryptal.ai')
+        self.page_size = config.get('api', {}).get('page_size', 100)
+        self.catalog = catalog or TaskCatalog(self.base_url, self.page_size)
+        self.breakers = breakers or CircuitBreakerRegistry.from_config(config)
+        self.headless = headless
+        # Выполненные задачи сохраняются по одной: после падения аккаунт продолжается с места остановки
+        self.state_store = state_store
     
-    async def fetch_tasks(self, token: str, context: str = "") -> List[Dict[str, Any]]:
+    async def fetch_tasks(self, token: str, context: str = "") -> List[Task]:
         """Получить список задач"""
         try:
-            # Получаем все задачи
-            all_tasks_url = f"{self.base_url}/apis/v2/vibe-credit/tasks?take=100&skip=0"
-            all_tasks_response = await self.http_client.get(all_tasks_url, token=token, context=context)
+            # Получаем все задачи (каталог общий для всех аккаунтов цикла)
+            all_tasks = await self.catalog.get(token, self.http_client, context)
             
-            if not all_tasks_response['success']:
-                raise Exception('Failed to fetch full task list')
+            # Получаем доступные для пользователя задачи (все страницы)
+            user_available_url = f"{self.base_url}/apis/v2/vibe-credit/tasks/user-available"
+            user_available_task_ids = {
+                task_id async for task_id in self.http_client.paginate(
+                    user_available_url, token=token, context=context, page_size=self.page_size,
+                    parse=parse_available_id
+                )
+            }
             
-            if not all_tasks_response['response'].get('response', {}).get('data'):
-                raise Exception('Invalid task list response format')
-            
-            all_tasks = all_tasks_response['response']['response']['data']
-            
-            # Получаем доступные для пользователя задачи
-            user_available_url = f"{self.base_url}/apis/v2/vibe-credit/tasks/user-available?take=100&skip=0"
-            user_available_response = await self.http_client.get(user_available_url, token=token, context=context)
-            
-            if not user_available_response['success']:
-                raise Exception('Failed to fetch user-available tasks')
-            
-            if not user_available_response['response'].get('response', {}).get('data'):
-                raise Exception('Invalid user-available tasks response format')
-            
-            user_available_task_ids = [
-                task['id'] for task in user_available_response['response']['response']['data']
-            ]
-            
-            # Фильтруем и форматируем задачи
-            tasks = []
-            for task in all_tasks:
+            return [
+                task.with_status('pending' if task.id in user_available_task_ids else 'completed')
+                for task in all_tasks
                 # Исключаем задачи с приглашениями и репостами
-                if task.get('task_type') in ['invite_friend', 'share_post']:
-                    continue
-                
-                formatted_task = {
-                    'id': task.get('id'),
-                    'name': task.get('task_name'),
-                    'description': task.get('task_description'),
-                    'category': task.get('task_type'),
-                    'credits_reward': task.get('credits_reward', 0),
-                    'is_daily': task.get('is_daily', False),
-                    'is_one_time': task.get('is_one_time', False),
-                    'status': 'pending' if task.get('id') in user_available_task_ids else 'completed'
-                }
-                tasks.append(formatted_task)
-            
-            return tasks
-            
+                if task.category not in EXCLUDED_CATEGORIES
+            ]
         except Exception as e:
             Logger.error(f"Failed to fetch tasks: {e}", context=context)
             return []
     
-    async def complete_task(self, token: str, task: Dict[str, Any], context: str = "") -> Dict[str, Any]:
+    async def complete_task(self, token: str, task: Task, context: str = "") -> Dict[str, Any]:
         """Выполнить задачу"""
-        task_context = f"{context}|T{str(task['id'])[-6:]}"
-        task_name = task.get('name', 'Unknown Task')
-        category = task.get('category', 'unknown')
+        task_context = f"{context}|T{str(task.id)[-6:]}"
+        task_name = task.name
+        category = task.category
         
         Logger.info(f"Processing task: {task_name} [{category}]", emoji="🔄", context=task_context)
         
+        # URL, для которого breaker разрешил запрос, но исход еще не учтен
+        breaker_url = None
+        
         try:
             response = None
+            payload = None
             
-            # Обрабатываем разные типы задач
+            # Определяем эндпоинт для разных типов задач
             if category == 'daily_login':
                 url = f"{self.base_url}/apis/v2/vibe-credit/tasks/daily-login"
-                response = await self.http_client.get(url, token=token, context=task_context)
                 
             elif category == 'follow_cryptal':
                 url = f"{self.base_url}/apis/v2/vibe-credit/tasks/follow-cryptal"
-                response = await self.http_client.get(url, token=token, context=task_context)
                 
             elif category == 'join_discord':
                 url = f"{self.base_url}/apis/v2/vibe-credit/tasks/follow-discord"
-                response = await self.http_client.get(url, token=token, context=task_context)
                 
             elif category == 'join_waitlist':
                 email = get_random_email()
                 payload = {'email': email, 'first_name': ''}
                 url = f"{self.base_url}/apis/v2/vibe-credit/tasks/waitlist"
-                response = await self.http_client.post(url, payload, token=token, context=task_context)
                 
             elif category == 'submit_feedback':
                 feedback = get_random_feedback()
                 payload = {'feedback': feedback}
                 url = f"{self.base_url}/apis/v2/vibe-credit/tasks/feedback"
-                response = await self.http_client.post(url, payload, token=token, context=task_context)
                 
             else:
                 Logger.warn(f"Skipped: {task_name} [Category: {category}] - Task not supported", context=task_context)
-                return {'success': False, 'message': f'Skipped: {category} not supported'}
+                return {'success': False, 'message': f'Skipped: {category} not supported', 'requested': False}
+            
+            # Эндпоинт, отказавший для предыдущих аккаунтов, пропускаем до конца цикла
+            if not self.breakers.allow(url):
+                Logger.warn(f"Skipped: {task_name} [Category: {category}] - Endpoint circuit open", context=task_context)
+                return {'success': False, 'message': 'Skipped: Endpoint circuit open', 'requested': False, 'deferred': True}
+            
+            breaker_url = url
+            started = time.perf_counter()
+            if payload is not None:
+                response = await self.http_client.post(url, payload, token=token, context=task_context)
+            else:
+                response = await self.http_client.get(url, token=token, context=task_context)
+            elapsed = time.perf_counter() - started
+            metrics.observe('cryptal_task_duration_seconds', elapsed, {'category': category})
+            fields = {'endpoint': url, 'latency_ms': round(elapsed * 1000, 1)}
+            
+            breaker_url = None
+            if response and response['success']:
+                self.breakers.record_success(url)
+            elif response and response.get('status') == 401:
+                # Отозванный токен - проблема аккаунта, а не эндпоинта
+                self.breakers.release(url)
+            else:
+                self.breakers.record_failure(url)
             
             # Обрабатываем ответ
             if response and response['success']:
                 response_data = response.get('response', {})
                 if response_data.get('success') or 'already completed' in str(response_data.get('message', '')).lower():
-                    Logger.success(f"Completed: {task_name} [Category: {category}]", context=task_context)
+                    Logger.success(f"Completed: {task_name} [Category: {category}]", context=task_context, **fields)
                     return {'success': True, 'message': f'Task "{task_name}" completed or already completed'}
                 else:
                     error_msg = response_data.get('message', 'Unknown error')
-                    Logger.warn(f"Failed to complete {task_name}: {error_msg} [Category: {category}]", context=task_context)
+                    Logger.warn(f"Failed to complete {task_name}: {error_msg} [Category: {category}]", context=task_context, **fields)
                     return {'success': False, 'message': f'Failed: {error_msg}'}
                     
             elif response and response.get('status') == 404:
-                Logger.warn(f"Skipped: {task_name} [Category: {category}] - Task endpoint not found", context=task_context)
+                Logger.warn(f"Skipped: {task_name} [Category: {category}] - Task endpoint not found", context=task_context, **fields)
                 return {'success': False, 'message': 'Skipped: Task endpoint not found'}
                 
             else:
                 error_msg = response.get('message', 'Unknown error') if response else 'No response'
-                Logger.warn(f"Failed to complete {task_name}: {error_msg} [Category: {category}]", context=task_context)
+                Logger.warn(f"Failed to complete {task_name}: {error_msg} [Category: {category}]", context=task_context, **fields)
                 return {'success': False, 'message': f'Failed: {error_msg}'}
                 
         except Exception as e:
+            # Исключение во время запроса (например, некорректный JSON) - отказ эндпоинта
+            if breaker_url is not None:
+                self.breakers.record_failure(breaker_url)
             Logger.error(f"Failed to complete {task_name}: {e} [Category: {category}]", context=task_context)
             return {'success': False, 'message': f'Failed to complete: {e}'}
     
-    async def process_tasks(self, token: str, tasks: List[Dict[str, Any]], context: str = "") -> Dict[str, int]:
+    async def process_tasks(self, token: str, tasks: List[Task], context: str = "") -> Dict[str, int]:
         """Обработать все задачи"""
         if not tasks:
             Logger.info("No tasks available", emoji="⚠️", context=context)
-            return {'completed': 0, 'skipped': 0, 'failed': 0}
+            return {'completed': 0, 'skipped': 0, 'failed': 0, 'deferred': 0}
         
         # Фильтруем только незавершенные задачи
-        pending_tasks = [task for task in tasks if task.get('status') == 'pending']
+        pending_tasks = [task for task in tasks if task.status == 'pending']
         
         if not pending_tasks:
             Logger.info("All tasks already completed", emoji="✅", context=context)
-            return {'completed': 0, 'skipped': 0, 'failed': 0}
+            return {'completed': 0, 'skipped': 0, 'failed': 0, 'deferred': 0}
         
         completed_count = 0
         skipped_count = 0
         failed_count = 0
+        deferred_count = 0
+        
+        # Создаем прогресс бар (в headless режиме rich не импортируется)
+        progress = None
+        if not self.headless:
+            from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
+            progress = Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                TaskProgressColumn()
+            )
         
-        # Создаем прогресс бар
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            TaskProgressColumn(),
-            console=Logger.console if hasattr(Logger, 'console') else None
-        ) as progress:
+        with progress if progress is not None else contextlib.nullcontext():
             
             task_progress = progress.add_task(
                 "Processing tasks...", 
                 total=len(pending_tasks)
-            )
+            ) if progress is not None else None
             
             for task in pending_tasks:
-                try:
-                    result = await self.complete_task(token, task, context)
-                    
-                    if result['success']:
-                        task['status'] = 'completed'
-                        completed_count += 1
-                    elif 'Skipped' in result.get('message', ''):
-                        skipped_count += 1
-                    else:
-                        failed_count += 1
+                result = {}
+                # Полный id задачи попадает в JSON-лог отдельным полем, а не из контекста
+                with Logger.bind(task_id=task.id):
+                    try:
+                        result = await self.complete_task(token, task, context)
                         
-                except Exception as e:
-                    Logger.error(f"Error processing task {task.get('id', 'unknown')}: {e}", context=context)
-                    failed_count += 1
+                        if result['success']:
+                            task.status = 'completed'
+                            completed_count += 1
+                            if self.state_store:
+                                self.state_store.mark_tasks_done(token, [task])
+                        elif 'Skipped' in result.get('message', ''):
+                            skipped_count += 1
+                            if result.get('deferred'):
+                                deferred_count += 1
+                        else:
+                            failed_count += 1
+                            
+                    except Exception as e:
+                        Logger.error(f"Error processing task {task.id}: {e}", context=context)
+                        failed_count += 1
                 
-                progress.update(task_progress, advance=1)
+                if progress is not None:
+                    progress.update(task_progress, advance=1)
                 
-                # Задержка между задачами
-                delay_time = self.config.get('delays', {}).get('between_tasks', 2)
-                await delay(delay_time)
+                # Задержка между задачами (не нужна, если запрос не отправлялся)
+                if result.get('requested', True):
+                    delay_time = self.config.get('delays', {}).get('between_tasks', 2)
+                    await delay(delay_time)
         
         Logger.info(
             f"Processed {len(pending_tasks)} tasks: {completed_count} completed, {skipped_count} skipped, {failed_count} failed",
@@ -193,5 +264,6 @@ class TaskManager:
         return {
             'completed': completed_count,
             'skipped': skipped_count,
-            'failed': failed_count
+            'failed': failed_count,
+            'deferred': deferred_count
         }
\ No newline at end of file
@@ -6,6 +6,7 @@ from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
 import pyfiglet
+from .logger import Logger
 
 console = Console()
 
@@ -44,13 +45,12 @@ def print_header(title):
     content_text = f"│ {title.ljust(width - 4)} │"
     footer_text = f"┴{border}┴"
     
-    print(f"{Fore.CYAN}{header_text}{Style.RESET_ALL}")
-    print(f"{Fore.CYAN}{content_text}{Style.RESET_ALL}")
-    print(f"{Fore.CYAN}{footer_text}{Style.RESET_ALL}")
+    Logger.raw(f"{Fore.CYAN}{header_text}{Style.RESET_ALL}")
+    Logger.raw(f"{Fore.CYAN}{content_text}{Style.RESET_ALL}")
+    Logger.raw(f"{Fore.CYAN}{footer_text}{Style.RESET_ALL}")
 
 def print_info(label, value, context=""):
     """Вывести информацию в формате label: value"""
-    from .logger import Logger
     Logger.info(f"{label.ljust(15)}: {Fore.CYAN}{value}{Style.RESET_ALL}", emoji="📍 ", context=context)
 
 def print_banner():
@@ -64,23 +64,21 @@ def print_banner():
     for line in title.split('\n'):
         if line.strip():
             centered_line = center_text(line, width)
-            print(f"{Fore.CYAN}{centered_line}{Style.RESET_ALL}")
+            Logger.raw(f"{Fore.CYAN}{centered_line}{Style.RESET_ALL}")
     
     # Выводим подзаголовки
     subtitle1 = "=== Telegram Channel 🚀 : NT EXHAUST @NTExhaust ==="
     subtitle2 = "✪ BOT CRYPTAL AI AUTO COMPLETE DAILY TASKS ✪"
     
-    print(f"{Fore.MAGENTA}{center_text(subtitle1, width)}{Style.RESET_ALL}")
-    print(f"{Fore.MAGENTA}{center_text(subtitle2, width)}{Style.RESET_ALL}")
-    print()
+    Logger.raw(f"{Fore.MAGENTA}{center_text(subtitle1, width)}{Style.RESET_ALL}")
+    Logger.raw(f"{Fore.MAGENTA}{center_text(subtitle2, width)}{Style.RESET_ALL}")
+    Logger.raw()
 
 def format_task_table(tasks, context=""):
     """Форматировать и вывести таблицу задач"""
-    from .logger import Logger
-    
-    print()
+    Logger.raw()
     Logger.info("Task List:", context=context, emoji="📋 ")
-    print()
+    Logger.raw()
     
     # Создаем таблицу с помощью rich
     table = Table(show_header=True, header_style="bold cyan")
@@ -91,15 +89,15 @@ def format_task_table(tasks, context=""):
     
     for task in tasks:
         # Обрезаем длинные названия задач
-        display_name = task.get('description', 'Unknown Task')
+        display_name = task.description
         if len(display_name) > 20:
             display_name = display_name[:17] + '...'
         
-        category = str(task.get('category', 'N/A'))[:8]
-        points = str(task.get('credits_reward', 0))[:5]
+        category = str(task.category)[:8]
+        points = str(task.credits_reward)[:5]
         
-        status_color = "green" if task.get('status') == 'completed' else "yellow"
-        status_text = "Complete" if task.get('status') == 'completed' else "Pending"
+        status_color = "green" if task.status == 'completed' else "yellow"
+        status_text = "Complete" if task.status == 'completed' else "Pending"
         
         table.add_row(
             display_name,
@@ -108,5 +106,8 @@ def format_task_table(tasks, context=""):
             f"[{status_color}]{status_text}[/{status_color}]"
         )
     
-    console.print(table)
-    print()
\ No newline at end of file
+    # Рендерим таблицу в строку, чтобы она вышла в общем порядке с логами
+    with console.capture() as capture:
+        console.print(table)
+    Logger.raw(capture.get().rstrip('\n'))
+    Logger.raw()
\ No newline at end of file
@@ -1,9 +1,7 @@
 import asyncio
 import random
-import json
 import os
 from typing import List, Optional
-import aiofiles
 
 async def delay(seconds: float):
     """Асинхронная задержка"""
@@ -37,6 +35,7 @@ async def read_file_lines(file_path: str) -> List[str]:
         if not os.path.exists(file_path):
             return []
         
+        import aiofiles
         async with aiofiles.open(file_path, 'r', encoding='utf-8') as file:
             content = await file.read()
             lines = [line.strip() for line in content.split('\n') if line.strip()]
@@ -45,16 +44,6 @@ async def read_file_lines(file_path: str) -> List[str]:
         print(f"Error reading file {file_path}: {e}")
         return []
 
-async def load_config(config_path: str = "config.json") -> dict:
-    """Загрузить конфигурацию из JSON файла"""
-    try:
-        async with aiofiles.open(config_path, 'r', encoding='utf-8') as file:
-            content = await file.read()
-            return json.loads(content)
-    except Exception as e:
-        print(f"Error loading config: {e}")
-        return {}
-
 def truncate_token(token: str, length: int = 8) -> str:
     """Обрезать токен для отображения"""
     if len(token) <= length:
@@ -62,7 +51,9 @@ def truncate_token(token: str, length: int = 8) -> str:
     return f"{token[:length]}..."
 
 def format_number(number) -> str:
-    """Форматировать число для отображения"""
+    """Форматировать число для отображения (N/A если значения нет)"""
+    if number is None:
+        return 'N/A'
     if isinstance(number, (int, float)):
         return f"{number:,}"
     return str(number)
\ No newline at end of file
@@ -1,51 +1,264 @@
+import atexit
+import contextlib
+import contextvars
 import datetime
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
 from colorama import Fore, Style, init
-from rich.console import Console
 
 # Инициализация colorama
 init(autoreset=True)
 
-console = Console()
+LEVELS = {
+    'DEBUG': 10,
+    'INFO': 20,
+    'SUCCESS': 25,
+    'WARN': 30,
+    'ERROR': 40,
+}
+
+LEVEL_COLORS = {
+    'DEBUG': Fore.WHITE,
+    'INFO': Fore.GREEN,
+    'SUCCESS': Fore.GREEN,
+    'WARN': Fore.YELLOW,
+    'ERROR': Fore.RED,
+}
+
+ANSI_RE = re.compile(r'\x1B\[[0-9;]*m')
+
+# Поля, добавляемые ко всем записям внутри Logger.bind (свои для каждой asyncio-задачи)
+_bound_fields = contextvars.ContextVar('logger_fields', default=None)
+
+# Запись в очереди без уровня - готовая строка для терминала (заголовки, таблицы)
+RAW = None
+
 
 class Logger:
-    """Класс для цветного логирования с временными метками"""
-    
+    """Класс для цветного логирования с временными метками.
+
+    Вызовы только кладут запись в очередь: форматирование, вывод в терминал
+    и запись JSON-lines файла выполняются пакетами в фоновом потоке.
+    """
+
+    level = LEVELS['INFO']
+    console_enabled = True
+    json_path = None
+    flush_interval = 0.5
+    batch_size = 200
+
+    _queue = queue.SimpleQueue()
+    _worker = None
+    _json_file = None
+    _lock = threading.Lock()
+    _pending = 0
+    _drained = threading.Condition(_lock)
+    _failed_sinks = set()
+
+    @classmethod
+    def configure(cls, level="INFO", json_file=None, console=True, flush_interval=0.5, batch_size=200):
+        """Настроить уровень, JSON-lines файл и параметры пакетной записи"""
+        cls.flush()
+        cls.level = LEVELS.get(str(level).upper(), LEVELS['INFO'])
+        cls.console_enabled = console
+        cls.flush_interval = flush_interval
+        cls.batch_size = max(1, batch_size)
+
+        error = None
+        if json_file != cls.json_path:
+            with cls._lock:
+                if cls._json_file:
+                    cls._json_file.close()
+                    cls._json_file = None
+                cls.json_path = json_file
+                if json_file:
+                    try:
+                        directory = os.path.dirname(json_file)
+                        if directory:
+                            os.makedirs(directory, exist_ok=True)
+                        cls._json_file = open(json_file, 'a', encoding='utf-8')
+                    except OSError as e:
+                        # Недоступный файл отключает только JSON-приемник, вывод в терминал продолжается
+                        cls._json_file = None
+                        error = e
+            if error is not None:
+                cls.warn(f"JSON log disabled, cannot open {json_file}: {error}")
+
+    @classmethod
+    def configure_from(cls, config):
+        """Настроить логгер из секции logging конфигурации"""
+        settings = config.get('logging', {})
+        cls.configure(
+            level=settings.get('level', 'INFO'),
+            json_file=settings.get('json_file'),
+            console=settings.get('console', True),
+            flush_interval=settings.get('flush_interval', 0.5),
+            batch_size=settings.get('batch_size', 200)
+        )
+
+    @classmethod
+    def _enqueue(cls, record):
+        with cls._lock:
+            cls._pending += 1
+            if cls._worker is None or not cls._worker.is_alive():
+                cls._worker = threading.Thread(target=cls._run, name="logger", daemon=True)
+                cls._worker.start()
+        cls._queue.put(record)
+
     @staticmethod
-    def _get_timestamp():
-        """Получить текущее время в формате строки"""
-        return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
+    @contextlib.contextmanager
+    def bind(**fields):
+        """Добавить поля (account, task_id) ко всем JSON-записям внутри блока"""
+        bound = _bound_fields.get()
+        token = _bound_fields.set({**bound, **fields} if bound else fields)
+        try:
+            yield
+        finally:
+            _bound_fields.reset(token)
+
+    @classmethod
+    def _log(cls, level, message, emoji, context, fields):
+        if LEVELS[level] < cls.level:
+            return
+        bound = _bound_fields.get()
+        if bound:
+            fields = {**bound, **fields}
+        cls._enqueue((level, time.time(), message, emoji, context, fields))
+
+    @classmethod
+    def raw(cls, text=""):
+        """Вывести готовую строку в терминал в общем порядке с логами"""
+        if cls.console_enabled:
+            cls._enqueue((RAW, None, text, "", "", None))
+
+    @classmethod
+    def flush(cls, timeout=5.0):
+        """Дождаться записи всех сообщений из очереди"""
+        deadline = time.monotonic() + timeout
+        with cls._drained:
+            while cls._pending > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or cls._worker is None or not cls._worker.is_alive():
+                    break
+                cls._drained.wait(remaining)
+
+    @classmethod
+    def _run(cls):
+        """Фоновый поток: собрать пакет записей и записать его одним вызовом"""
+        while True:
+            batch = [cls._queue.get()]
+            deadline = time.monotonic() + cls.flush_interval
+            while len(batch) < cls.batch_size:
+                try:
+                    batch.append(cls._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                cls._write(batch)
+            except Exception as e:
+                cls._sink_error('formatter', e)
+            with cls._drained:
+                cls._pending -= len(batch)
+                cls._drained.notify_all()
+
+    @classmethod
+    def _write(cls, batch):
+        lines = []
+        json_lines = []
+        for level, ts, message, emoji, context, fields in batch:
+            if level is RAW:
+                lines.append(message)
+                continue
+            if cls.console_enabled:
+                lines.append(cls._format_message(level, ts, message, emoji, context))
+            if cls._json_file:
+                json_lines.append(cls._format_json(level, ts, message, context, fields))
+
+        # Каждый приемник пишется отдельно: ошибка терминала не теряет JSON-записи и наоборот
+        if lines:
+            try:
+                # sys.stdout берется в момент записи: rich Progress подменяет его на время отрисовки
+                sys.stdout.write('\n'.join(lines) + '\n')
+                sys.stdout.flush()
+            except Exception as e:
+                cls._sink_error('console', e)
+        if json_lines:
+            try:
+                with cls._lock:
+                    if cls._json_file:
+                        cls._json_file.write('\n'.join(json_lines) + '\n')
+                        cls._json_file.flush()
+            except Exception as e:
+                cls._sink_error(cls.json_path, e)
+
+    @classmethod
+    def _sink_error(cls, sink, error):
+        """Сообщить об ошибке приемника в stderr один раз для каждого приемника"""
+        if sink in cls._failed_sinks:
+            return
+        cls._failed_sinks.add(sink)
+        try:
+            sys.stderr.write(f"Logger: failed to write to {sink}: {error!r}\n")
+            sys.stderr.flush()
+        except Exception:
+            pass
+
     @staticmethod
-    def _format_message(level, message, emoji="", context=""):
+    def _get_timestamp(ts=None):
+        """Получить время в формате строки"""
+        return datetime.datetime.fromtimestamp(time.time() if ts is None else ts).strftime("%Y-%m-%d %H:%M:%S")
+
+    @staticmethod
+    def _format_message(level, ts, message, emoji="", context=""):
         """Форматировать сообщение с временной меткой и контекстом"""
-        timestamp = Logger._get_timestamp()
+        timestamp = Logger._get_timestamp(ts)
+        level_str = f"{LEVEL_COLORS[level]}{level}{Style.RESET_ALL}"
         context_str = f"[{context}] " if context else ""
-        return f"[ {Fore.WHITE}{timestamp}{Style.RESET_ALL} ] {emoji}{level} {context_str.ljust(20)}{Fore.WHITE}{message}{Style.RESET_ALL}"
-    
+        return f"[ {Fore.WHITE}{timestamp}{Style.RESET_ALL} ] {emoji}{level_str} {context_str.ljust(20)}{Fore.WHITE}{message}{Style.RESET_ALL}"
+
+    @staticmethod
+    def _format_json(level, ts, message, context, fields):
+        """Сформировать JSON-строку записи"""
+        record = {
+            'ts': datetime.datetime.fromtimestamp(ts, datetime.timezone.utc).isoformat(timespec='milliseconds'),
+            'level': level,
+            'message': ANSI_RE.sub('', str(message)),
+        }
+        if context:
+            record['context'] = context
+        if fields:
+            record.update(fields)
+        return json.dumps(record, ensure_ascii=False, default=str)
+
+    @staticmethod
+    def debug(message, emoji="🔍 ", context="", **fields):
+        """Вывести отладочное сообщение"""
+        Logger._log('DEBUG', message, emoji, context, fields)
+
     @staticmethod
-    def info(message, emoji="ℹ️ ", context=""):
+    def info(message, emoji="ℹ️ ", context="", **fields):
         """Вывести информационное сообщение"""
-        level = f"{Fore.GREEN}INFO{Style.RESET_ALL}"
-        formatted_msg = Logger._format_message(level, message, emoji, context)
-        print(formatted_msg)
-    
+        Logger._log('INFO', message, emoji, context, fields)
+
     @staticmethod
-    def warn(message, emoji="⚠️ ", context=""):
+    def warn(message, emoji="⚠️ ", context="", **fields):
         """Вывести предупреждение"""
-        level = f"{Fore.YELLOW}WARN{Style.RESET_ALL}"
-        formatted_msg = Logger._format_message(level, message, emoji, context)
-        print(formatted_msg)
-    
+        Logger._log('WARN', message, emoji, context, fields)
+
     @staticmethod
-    def error(message, emoji="❌ ", context=""):
+    def error(message, emoji="❌ ", context="", **fields):
         """Вывести сообщение об ошибке"""
-        level = f"{Fore.RED}ERROR{Style.RESET_ALL}"
-        formatted_msg = Logger._format_message(level, message, emoji, context)
-        print(formatted_msg)
-    
+        Logger._log('ERROR', message, emoji, context, fields)
+
     @staticmethod
-    def success(message, emoji="✅ ", context=""):
+    def success(message, emoji="✅ ", context="", **fields):
         """Вывести сообщение об успехе"""
-        level = f"{Fore.GREEN}SUCCESS{Style.RESET_ALL}"
-        formatted_msg = Logger._format_message(level, message, emoji, context)
-        print(formatted_msg)
\ No newline at end of file
+        Logger._log('SUCCESS', message, emoji, context, fields)
+
+
+atexit.register(Logger.flush)
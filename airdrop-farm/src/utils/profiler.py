@@ -0,0 +1,209 @@
+import asyncio
+import cProfile
+import datetime
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Callable, Awaitable, Any, Tuple
+
+# Функции, оборачиваемые спанами: (модуль, класс или None, имя)
+SPAN_TARGETS = [
+    ('src.core.http_client', 'HttpClient', 'request_with_retry'),
+    ('src.modules.task_manager', 'TaskManager', 'fetch_tasks'),
+    ('src.utils.display', None, 'print_banner'),
+    ('src.utils.display', None, 'print_header'),
+    ('src.utils.display', None, 'print_info'),
+    ('src.utils.display', None, 'format_task_table'),
+]
+
+IDLE_FRAME = '[event loop wait]'
+
+
+class SpanRecorder:
+    """Спаны: время выполнения обернутых функций и стек активных спанов по задачам asyncio"""
+
+    def __init__(self):
+        self.totals: Dict[str, List[float]] = defaultdict(list)
+        self.active: Dict[int, List[str]] = {}
+        self._patched: List[Tuple[Any, str, Any]] = []
+
+    def _task_key(self) -> int:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        return id(task) if task is not None else 0
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """Обернуть функцию (синхронную или корутину) спаном"""
+        recorder = self
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_span(*args, **kwargs):
+                key = recorder._task_key()
+                stack = recorder.active.setdefault(key, [])
+                stack.append(name)
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    recorder.totals[name].append(time.perf_counter() - started)
+                    stack.pop()
+            return async_span
+
+        @functools.wraps(func)
+        def sync_span(*args, **kwargs):
+            key = recorder._task_key()
+            stack = recorder.active.setdefault(key, [])
+            stack.append(name)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                recorder.totals[name].append(time.perf_counter() - started)
+                stack.pop()
+        return sync_span
+
+    def install(self, targets=SPAN_TARGETS):
+        """Подменить целевые функции обертками"""
+        import importlib
+        for module_name, class_name, attr in targets:
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError:
+                continue
+            owner = getattr(module, class_name) if class_name else module
+            original = getattr(owner, attr)
+            span_name = f"{class_name}.{attr}" if class_name else f"display.{attr}"
+            self._patched.append((owner, attr, original))
+            setattr(owner, attr, self.wrap(span_name, original))
+
+    def uninstall(self):
+        """Вернуть исходные функции"""
+        for owner, attr, original in reversed(self._patched):
+            setattr(owner, attr, original)
+        self._patched.clear()
+
+    def current_spans(self) -> List[str]:
+        """Активные спаны всех задач (для атрибуции ожидания event loop)"""
+        spans = []
+        for stack in list(self.active.values()):
+            spans.extend(stack)
+        return spans
+
+    def report(self) -> List[str]:
+        """Текстовая таблица спанов"""
+        lines = [f"{'Span':<32} {'calls':>6} {'total s':>9} {'avg ms':>9} {'max ms':>9}"]
+        for name, values in sorted(self.totals.items(), key=lambda item: sum(item[1]), reverse=True):
+            lines.append(
+                f"{name:<32} {len(values):>6} {sum(values):>9.3f} "
+                f"{sum(values) / len(values) * 1000:>9.2f} {max(values) * 1000:>9.2f}"
+            )
+        return lines
+
+
+class SamplingProfiler:
+    """Сэмплирующий профилировщик потока event loop с выводом в формате folded stacks"""
+
+    def __init__(self, spans: SpanRecorder, interval: float = 0.005):
+        self.spans = spans
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    @staticmethod
+    def _frame_name(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            idle = False
+            while frame is not None:
+                code = frame.f_code
+                if code.co_name == 'select' and code.co_filename.endswith('selectors.py'):
+                    idle = True
+                stack.append(self._frame_name(frame))
+                frame = frame.f_back
+
+            if idle:
+                # Event loop ждет сеть/таймеры: относим ожидание к активным спанам
+                folded = ';'.join([IDLE_FRAME] + self.spans.current_spans())
+            else:
+                folded = ';'.join(reversed(stack))
+            self.samples[folded] += 1
+
+    def write_folded(self, path: str):
+        """Записать folded stacks (flamegraph.pl, speedscope, inferno)"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def idle_share(self) -> float:
+        """Доля сэмплов, когда event loop ожидал ввод-вывод"""
+        total = sum(self.samples.values())
+        idle = sum(count for stack, count in self.samples.items() if stack.startswith(IDLE_FRAME))
+        return idle / total if total else 0.0
+
+
+async def profile_cycle(
+    run_cycle: Callable[[], Awaitable[Any]],
+    output_dir: str = "data/profiles",
+    include_display: bool = True
+) -> Dict[str, str]:
+    """Выполнить один цикл под cProfile и сэмплирующим профилировщиком, сохранить результаты"""
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    base = os.path.join(output_dir, f"cycle-{stamp}")
+    paths = {
+        'cprofile': f"{base}.prof",
+        'folded': f"{base}.folded",
+        'spans': f"{base}.spans.txt",
+    }
+
+    spans = SpanRecorder()
+    sampler = SamplingProfiler(spans)
+    profile = cProfile.Profile()
+
+    # В headless режиме модуль отображения не импортируется и не оборачивается
+    targets = [target for target in SPAN_TARGETS if include_display or target[0] != 'src.utils.display']
+    spans.install(targets)
+    sampler.start()
+    started = time.perf_counter()
+    profile.enable()
+    try:
+        await run_cycle()
+    finally:
+        profile.disable()
+        wall_time = time.perf_counter() - started
+        sampler.stop()
+        spans.uninstall()
+
+    profile.dump_stats(paths['cprofile'])
+    sampler.write_folded(paths['folded'])
+    with open(paths['spans'], 'w', encoding='utf-8') as f:
+        f.write(f"Cycle wall time: {wall_time:.3f}s\n")
+        f.write(f"Event loop waiting on I/O: {sampler.idle_share() * 100:.1f}% of samples\n\n")
+        f.write('\n'.join(spans.report()) + '\n')
+
+    return paths